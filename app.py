@@ -1,17 +1,39 @@
 import csv
-import io
+import logging
 import os
 import re
-from typing import List, Tuple
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Any, Dict, Iterator, List, Tuple
 from urllib.parse import urljoin
 
-from flask import Flask, render_template, request, Response, jsonify
+import orjson
+from flask import Flask, render_template, request, Response, jsonify, redirect, url_for
+from flask.json.provider import JSONProvider
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# HTTP/2 client for Google CSE when httpx and h2 are installed (optional).
+try:
+    import httpx
+    import h2  # noqa: F401  (required by httpx for http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Quiet by default; set LOG_LEVEL=INFO or DEBUG to see scrape progress messages.
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
+logger = logging.getLogger(__name__)
+
 # Import scraper functions
 from scrapy_scraper import (
     scrape_websites_with_scrapy,
@@ -22,32 +44,142 @@ from scrapy_scraper import (
     get_scraped_items,
     get_job_urls,
 )
-from list_importer import search_from_list, normalize_url
+from list_importer import search_from_list, search_from_lists, normalize_url
 
 # Import database for caching and persistence (optional)
 try:
     from database import (
         init_db, 
         get_recent_jobs, 
+        job_summary_dict,
         get_job_items,
         get_cached_search, 
         save_search_cache, 
-        make_cache_key,
+        make_query_cache_key,
     )
+    from job_manager import get_any_progress, get_any_job_data, is_celery_available, start_job
     init_db()
     DB_AVAILABLE = True
 except Exception as e:
-    print(f"Database not available: {e}")
+    logger.warning("Database not available: %s", e)
     DB_AVAILABLE = False
     def get_recent_jobs(limit=50): return []
+    def job_summary_dict(job): return {}
     def get_job_items(job_id): return []
+    def get_any_progress(job_id): return get_scraping_progress(job_id=job_id)
+    def get_any_job_data(job_id): return get_job_urls(job_id), get_scraped_items(job_id)
+    def is_celery_available(): return False
+
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson for faster (de)serialization of large payloads."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Google Custom Search configuration
 GOOGLE_CSE_API_KEY = os.getenv("GOOGLE_CSE_API_KEY")
 GOOGLE_CSE_CX = os.getenv("GOOGLE_CSE_CX")  # Search engine ID – must be set.
 
+# Shared session so TCP/TLS connections to googleapis.com are reused across searches.
+_CSE_SESSION = requests.Session()
+_CSE_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,  # hand the last response to raise_for_status()
+        ),
+    ),
+)
+_CSE_SESSION.headers.update({"Accept-Encoding": "gzip, deflate"})
+
+_CSE_URL = "https://www.googleapis.com/customsearch/v1"
+_CSE_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# With httpx, concurrent page fetches multiplex over a single HTTP/2 connection
+# instead of one TLS socket each. The transport retries connection failures;
+# status retries are done in _cse_get() to match the requests adapter above.
+_CSE_CLIENT: Any = None
+if HTTP2_AVAILABLE:
+    _CSE_CLIENT = httpx.Client(
+        timeout=httpx.Timeout(25.0, connect=5.0),
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+        ),
+    )
+
+
+# Practice areas for lawyers
+PRACTICE_AREAS = (
+    "Criminal Law",
+    "Corporate Law",
+    "Family Law",
+    "Personal Injury",
+    "Real Estate Law",
+    "Immigration Law",
+    "Intellectual Property",
+    "Employment Law",
+    "Tax Law",
+    "Estate Planning",
+    "Bankruptcy Law",
+    "Medical Malpractice",
+    "Immigration",
+    "DUI/DWI",
+    "Workers Compensation",
+)
+_PRACTICE_AREAS_SET = frozenset(PRACTICE_AREAS)
+
+# Filename slugs: spaces become underscores (single C-level pass via str.translate).
+_SLUG_TABLE = str.maketrans(" ", "_")
+_PRACTICE_AREA_SLUGS = {area: area.translate(_SLUG_TABLE).lower() for area in PRACTICE_AREAS}
+
+# Column order for CSV exports
+CSV_FIELDNAMES = (
+    "website",
+    "lawyer_name",
+    "lawyer_email",
+    "lawyer_phone",
+    "profile_url",
+    "profile_images",
+    "vcard_content",
+    "all_emails",
+    "all_phones",
+    "vcard_links",
+    "vcard_files_count",
+    "pdf_links",
+    "image_links",
+    "lawyer_profiles_count",
+)
+# Header line yielded verbatim before the rows. None of the field names need
+# quoting, and the "\r\n" terminator matches csv.writer's default dialect.
+CSV_HEADER_ROW = ",".join(CSV_FIELDNAMES) + "\r\n"
+
+
+# Substrings that make a line worth tokenizing (one compiled alternation, so a
+# line is scanned once), and the token shapes kept from it.
+_WEBSITE_LINE_MARKERS = ("http://", "https://", ".com", ".io", ".ai")
+_WEBSITE_LINE_MARKER_RE = re.compile("|".join(map(re.escape, _WEBSITE_LINE_MARKERS)))
+# Token separators besides whitespace, mapped to spaces in one translate() pass.
+_SPLIT_TABLE = str.maketrans(",;", "  ")
+_WEBSITE_SCHEMES = ("http://", "https://")
+_WEBSITE_TLDS = (".com", ".io", ".ai", ".co", ".org", ".net")
+
 
 def extract_websites_from_text(text: str) -> List[str]:
     """
@@ -55,24 +187,195 @@ def extract_websites_from_text(text: str) -> List[str]:
     Kept for compatibility but not used by the Google Custom Search flow.
     """
     websites: List[str] = []
+    seen: set[str] = set()
     for line in text.splitlines():
         line = line.strip()
         if not line:
             continue
-        if "http://" in line or "https://" in line or ".com" in line or ".io" in line or ".ai" in line:
-            tokens = line.replace(",", " ").replace(";", " ").split()
+        if _WEBSITE_LINE_MARKER_RE.search(line):
+            tokens = line.translate(_SPLIT_TABLE).split()
             for token in tokens:
                 token = token.strip("()[]{}.,;")
-                if (
-                    token.startswith("http://")
-                    or token.startswith("https://")
-                    or any(token.endswith(tld) for tld in [".com", ".io", ".ai", ".co", ".org", ".net"])
-                ):
-                    if token not in websites:
+                if token.startswith(_WEBSITE_SCHEMES) or token.endswith(_WEBSITE_TLDS):
+                    if token not in seen:
+                        seen.add(token)
                         websites.append(token)
     return websites
 
 
+def _normalize_query_part(value: str) -> str:
+    return " ".join((value or "").split()).lower()
+
+
+def _clamp_env_int(name: str, default: int, low: int, high: int) -> int:
+    try:
+        value = int(os.getenv(name, default))
+    except ValueError:
+        value = default
+    return min(max(value, low), high)
+
+
+CSE_PAGE_SIZE = 10
+# The API only returns up to 100 results, so with 10 per page "start" cannot
+# exceed 91 (Google answers 400 past that).
+CSE_MAX_START_INDEX = 91
+
+# In-process cache of CSE responses: max entries (0 disables it), each kept for
+# as long as the SQLite search cache keeps a page.
+CSE_CACHE_SIZE = _clamp_env_int("CSE_CACHE_SIZE", 1024, 0, 50000)
+SEARCH_CACHE_TTL_HOURS = 24
+CSE_CACHE_TTL_SECONDS = SEARCH_CACHE_TTL_HOURS * 3600
+CSE_REDIS_TTL_SECONDS = 3600
+
+# (query, start_index) -> (expires_at, (websites, total_results)), oldest first.
+_cse_cache: Dict[Tuple[str, int], Tuple[float, Tuple[Tuple[str, ...], int]]] = {}
+_cse_cache_lock = threading.Lock()
+
+# Optional shared Redis layer so multiple workers reuse each other's CSE results.
+# Probed once; stays disabled if REDIS_URL is unset or Redis is unreachable.
+_cse_redis: Any = None
+_cse_redis_checked = False
+_cse_redis_lock = threading.Lock()
+
+
+def _get_cse_redis():
+    global _cse_redis, _cse_redis_checked
+    if _cse_redis_checked:
+        return _cse_redis
+    with _cse_redis_lock:
+        if not _cse_redis_checked:
+            redis_url = os.getenv("REDIS_URL")
+            if redis_url:
+                try:
+                    from redis import Redis
+                    client = Redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+                    client.ping()
+                    _cse_redis = client
+                except Exception as e:
+                    logger.warning("CSE Redis cache not available: %s", e)
+            _cse_redis_checked = True
+    return _cse_redis
+
+
+def _cse_get(params: Dict[str, Any]) -> Any:
+    """
+    GET the CSE endpoint over HTTP/2 when httpx is available, else via the pooled
+    requests session. Either response supports raise_for_status() and json().
+    """
+    if _CSE_CLIENT is None:
+        return _CSE_SESSION.get(_CSE_URL, params=params, timeout=(5, 25))  # (connect, read)
+
+    for attempt in range(4):
+        if attempt:
+            time.sleep(0.3 * 2 ** (attempt - 1))
+        resp = _CSE_CLIENT.get(_CSE_URL, params=params)
+        if resp.status_code not in _CSE_RETRY_STATUSES:
+            break
+    return resp
+
+
+def _cse_fetch(query: str, start_index: int, use_cache: bool = True) -> Tuple[Tuple[str, ...], int]:
+    """
+    Fetch one page of Google CSE results as (normalized websites, total_results).
+    Memoized in-process for CSE_CACHE_TTL_SECONDS and, when configured, in Redis;
+    use_cache=False bypasses both.
+    """
+    if not use_cache or not CSE_CACHE_SIZE:
+        return _cse_fetch_remote(query, start_index, use_redis=use_cache)
+
+    key = (query, start_index)
+    now = time.monotonic()
+    with _cse_cache_lock:
+        cached = _cse_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    result = _cse_fetch_remote(query, start_index, use_redis=True)
+    with _cse_cache_lock:
+        _cse_cache.pop(key, None)
+        if len(_cse_cache) >= CSE_CACHE_SIZE:
+            # Drop expired pages first, then the oldest ones
+            for stale_key in [k for k, (expires_at, _) in _cse_cache.items() if expires_at <= now]:
+                del _cse_cache[stale_key]
+            while len(_cse_cache) >= CSE_CACHE_SIZE:
+                del _cse_cache[next(iter(_cse_cache))]
+        _cse_cache[key] = (now + CSE_CACHE_TTL_SECONDS, result)
+    return result
+
+
+def _cse_fetch_remote(query: str, start_index: int, use_redis: bool) -> Tuple[Tuple[str, ...], int]:
+    """Fetch one CSE page from Redis (when configured and use_redis) or the API."""
+    redis_client = _get_cse_redis() if use_redis else None
+    redis_key = "cse:" + blake2b(f"{query}|{start_index}".encode(), digest_size=16).hexdigest()
+    if redis_client is not None:
+        try:
+            blob = redis_client.get(redis_key)
+            if blob:
+                cached = orjson.loads(blob)
+                return tuple(cached["results"]), cached["total_results"]
+        except Exception:
+            pass
+
+    resp = _cse_get(
+        {
+            "key": GOOGLE_CSE_API_KEY,
+            "cx": GOOGLE_CSE_CX,
+            "q": query,
+            "num": CSE_PAGE_SIZE,
+            "start": start_index,
+        }
+    )
+    resp.raise_for_status()
+    data = resp.json()
+
+    items = data.get("items", []) or []
+    total_results_raw = data.get("searchInformation", {}).get("totalResults", "0")
+    try:
+        total_results = int(total_results_raw)
+    except (TypeError, ValueError):
+        total_results = len(items)
+    # Normalize at the source so the URLs rendered into the result form are
+    # already canonical when they come back as selected_urls.
+    websites = tuple(
+        dict.fromkeys(normalize_url(item["link"]) or item["link"] for item in items if item.get("link"))
+    )
+
+    if redis_client is not None and websites:
+        try:
+            redis_client.setex(
+                redis_key,
+                CSE_REDIS_TTL_SECONDS,
+                orjson.dumps({"results": websites, "total_results": total_results}),
+            )
+        except Exception:
+            pass
+
+    return websites, total_results
+
+
+@lru_cache(maxsize=512)
+def _build_cse_query(industry: str, service: str, location: str, country: str, place: str) -> str:
+    """
+    Build the CSE query for a filter combination (memoized, since paging through
+    results repeats the same filters). Each filter is case-folded and
+    whitespace-collapsed so "Tax Law" and "tax  law " share cache slots.
+    """
+    industry_q, service_q, location_q, country_q, place_q = (
+        _normalize_query_part(p) for p in (industry, service, location, country, place)
+    )
+    parts = (
+        f"{industry_q} lawyer" if industry_q else "",
+        service_q,
+        location_q,
+        country_q,
+        place_q,
+        # Always include law firm/lawyer keywords
+        "law firm",
+        "attorney",
+    )
+    return " ".join(p for p in parts if p)
+
+
 def get_websites_for_filters(
     industry: str,
     service: str,
@@ -81,12 +384,15 @@ def get_websites_for_filters(
     place: str,
     page: int = 1,
     use_cache: bool = True,
+    prefetch: bool = True,
 ) -> Tuple[List[str], int]:
     """
     Use Google Custom Search to find relevant business / company websites
     for the given filters. Returns (websites, total_results).
     
     Results are cached in SQLite for 24 hours to reduce API calls.
+    On a cache miss the next page is fetched into the cache in the background
+    (unless prefetch=False) so paginating forward is served from SQLite.
     """
     if not GOOGLE_CSE_API_KEY:
         raise RuntimeError(
@@ -108,95 +414,139 @@ def get_websites_for_filters(
             "See README.md for detailed setup instructions."
         )
 
+    query = _build_cse_query(industry, service, location, country, place)
+
+    # Google CSE supports pagination via the "start" parameter (1-based index).
+    requested_page = max(page, 1)
+    start_index = min((requested_page - 1) * CSE_PAGE_SIZE + 1, CSE_MAX_START_INDEX)
+
     # Build location string for caching
     location_str = " ".join(p for p in [location, place] if p).strip()
-    
-    # Check cache first (if database available)
+
+    # Check cache first (if database available). Keyed on the actual query sent
+    # to Google so equivalent filter combinations share an entry.
+    cache_key = make_query_cache_key(query, start_index) if DB_AVAILABLE else None
     if use_cache and DB_AVAILABLE:
         try:
-            cached = get_cached_search(industry, location_str, country, page)
+            cached = get_cached_search(industry, location_str, country, page, cache_key=cache_key)
             if cached:
                 return cached["results"], cached["total_results"]
         except Exception:
             pass
 
-    # Build a search query specifically for lawyers and law firms
-    parts = []
-    if industry:
-        parts.append(f"{industry} lawyer")
-    if service:
-        parts.append(service)
-    if location:
-        parts.append(location)
-    if country:
-        parts.append(country)
-    if place:
-        parts.append(place)
-    # Always include law firm/lawyer keywords
-    parts.append("law firm")
-    parts.append("attorney")
-    query = " ".join(p for p in parts if p).strip()
-
-    # Google CSE supports pagination via the "start" parameter (1-based index).
-    # The API only returns up to 100 results. With page_size=10 this means
-    # start_index cannot be greater than 91, otherwise a 400 is returned.
-    page_size = 10
-    requested_page = max(page, 1)
-    start_index = (requested_page - 1) * page_size + 1
-    if start_index > 91:
-        start_index = 91
-
-    resp = requests.get(
-        "https://www.googleapis.com/customsearch/v1",
-        params={
-            "key": GOOGLE_CSE_API_KEY,
-            "cx": GOOGLE_CSE_CX,
-            "q": query,
-            "num": page_size,
-            "start": start_index,
-        },
-        timeout=30,
-    )
-    resp.raise_for_status()
-    data = resp.json()
-
-    items = data.get("items", []) or []
-    total_results_raw = data.get("searchInformation", {}).get("totalResults", "0")
-    try:
-        total_results = int(total_results_raw)
-    except (TypeError, ValueError):
-        total_results = len(items)
-    websites: List[str] = []
-    for item in items:
-        link = item.get("link")
-        if link and link not in websites:
-            websites.append(link)
+    results, total_results = _cse_fetch(query, start_index, use_cache=use_cache)
+    websites: List[str] = list(results)
     
     # Cache results for 24 hours (if database available)
     if use_cache and websites and DB_AVAILABLE:
         try:
-            save_search_cache(industry, location_str, country, page, websites, total_results, ttl_hours=24)
+            save_search_cache(
+                industry,
+                location_str,
+                country,
+                page,
+                websites,
+                total_results,
+                ttl_hours=SEARCH_CACHE_TTL_HOURS,
+                cache_key=cache_key,
+                query=query,
+            )
         except Exception:
             pass
 
+        next_start = start_index + CSE_PAGE_SIZE
+        if prefetch and next_start <= CSE_MAX_START_INDEX and next_start <= total_results:
+            threading.Thread(
+                target=_prefetch_page,
+                args=(industry, service, location, country, place, requested_page + 1),
+                daemon=True,
+                name="cse-prefetch",
+            ).start()
+
     return websites, total_results
 
 
+def _prefetch_page(industry: str, service: str, location: str, country: str, place: str, page: int) -> None:
+    """Warm the search cache for one page; errors are ignored (the user never waits on this)."""
+    try:
+        get_websites_for_filters(industry, service, location, country, place, page=page, prefetch=False)
+    except Exception:
+        pass
+
+
+# Google CSE serves at most 100 results (10 pages). Pages past the first are
+# fetched concurrently over the pooled _CSE_SESSION; 5 workers keeps well under
+# the per-user QPS quota.
+CSE_MAX_PAGES = 10
+_CSE_PAGE_EXECUTOR = ThreadPoolExecutor(max_workers=5, thread_name_prefix="cse-page")
+
+
+def fetch_all_pages(
+    industry: str,
+    service: str,
+    location: str,
+    country: str,
+    place: str,
+    max_pages: int = CSE_MAX_PAGES,
+) -> Tuple[List[str], int]:
+    """
+    Fetch every result page for the given filters and return (websites, total_results).
+    Page 1 is fetched first to learn total_results; the remaining pages run in
+    parallel and are merged back in page order.
+    """
+    websites, total_results = get_websites_for_filters(
+        industry, service, location, country, place, page=1, prefetch=False
+    )
+    last_page = min(max_pages, CSE_MAX_PAGES, -(-total_results // CSE_PAGE_SIZE))
+    futures = {
+        _CSE_PAGE_EXECUTOR.submit(
+            get_websites_for_filters, industry, service, location, country, place, page=p, prefetch=False
+        ): p
+        for p in range(2, last_page + 1)
+    }
+    pages: Dict[int, List[str]] = {1: websites}
+    for future in as_completed(futures):
+        pages[futures[future]], _ = future.result()
+
+    merged = dict.fromkeys(url for p in sorted(pages) for url in pages[p])
+    return list(merged), total_results
+
+
 # Old scrape_website function removed - now using Scrapy
 
 
+def _get_json_body() -> dict | None:
+    """
+    Decode the request body with orjson straight from the raw bytes (no cached copy).
+    Returns {} for an empty body and None if the body is not a JSON object.
+    """
+    raw = request.get_data(cache=False)
+    if not raw:
+        return {}
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
 @app.route("/api/progress", methods=["GET"])
 def get_progress():
     """API endpoint to get scraping progress."""
     job_id = request.args.get("job_id")
-    progress = get_scraping_progress(job_id=job_id)
-    return jsonify(progress)
+    progress = get_any_progress(job_id) if job_id else get_scraping_progress()
+    response = jsonify(progress)
+    # Let a burst of polls from the same browser reuse the last answer briefly.
+    response.headers["Cache-Control"] = "private, max-age=1"
+    return response
 
 
 @app.route("/api/start-scrape", methods=["POST"])
 def api_start_scrape():
     """Start a scrape job and return a job_id."""
-    data = request.get_json(silent=True) or {}
+    data = _get_json_body()
+    if data is None:
+        return jsonify({"error": "invalid JSON"}), 400
     urls = data.get("urls") or []
     if not isinstance(urls, list):
         return jsonify({"error": "urls must be a list"}), 400
@@ -214,17 +564,21 @@ def api_start_scrape():
 
     # Use original scraper function (works reliably)
     job_id = start_scrape_job(normalized)
+    _clear_jobs_cache()
     return jsonify({"success": True, "job_id": job_id, "count": len(normalized)})
 
 
 @app.route("/api/stop-scrape", methods=["POST"])
 def api_stop_scrape():
     """Stop/cancel a running scrape job."""
-    data = request.get_json(silent=True) or {}
+    data = _get_json_body()
+    if data is None:
+        return jsonify({"error": "invalid JSON"}), 400
     job_id = str(data.get("job_id", "")).strip()
     if not job_id:
         return jsonify({"error": "job_id is required"}), 400
     ok = stop_scrape_job(job_id)
+    _clear_jobs_cache()
     return jsonify({"success": bool(ok), "job_id": job_id})
 
 
@@ -235,7 +589,7 @@ def api_results():
     if not job_id:
         return jsonify({"error": "job_id is required"}), 400
 
-    items = get_scraped_items(job_id)
+    _, items = get_any_job_data(job_id)
 
     # Flatten to rows for easier display (one row per profile, or one row per site if no profiles)
     rows = []
@@ -273,15 +627,39 @@ def progress_page(job_id: str):
     return render_template("progress.html", job_id=job_id)
 
 
+# Short-lived cache of /api/jobs payloads keyed by limit: limit -> (expires_at, payload).
+# Cleared whenever a job is started or stopped from this process.
+_JOBS_CACHE_TTL = 5.0
+_JOBS_CACHE_MAX_ENTRIES = 8
+_jobs_cache: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+_jobs_cache_lock = threading.Lock()
+
+
+def _clear_jobs_cache() -> None:
+    with _jobs_cache_lock:
+        _jobs_cache.clear()
+
+
 @app.route("/api/jobs", methods=["GET"])
 def api_jobs():
     """Get list of recent jobs from database."""
     limit = request.args.get("limit", 50, type=int)
+    now = time.monotonic()
+    with _jobs_cache_lock:
+        cached = _jobs_cache.get(limit)
+    if cached and cached[0] > now:
+        return jsonify(cached[1])
+
     jobs = get_recent_jobs(limit=limit)
-    return jsonify({
+    payload = {
         "count": len(jobs),
-        "jobs": [job.to_dict() for job in jobs]
-    })
+        "jobs": [job_summary_dict(job) for job in jobs]
+    }
+    with _jobs_cache_lock:
+        if len(_jobs_cache) >= _JOBS_CACHE_MAX_ENTRIES:
+            _jobs_cache.clear()
+        _jobs_cache[limit] = (now + _JOBS_CACHE_TTL, payload)
+    return jsonify(payload)
 
 
 @app.route("/history", methods=["GET"])
@@ -299,15 +677,14 @@ def admin_page():
 @app.route("/api/admin/data", methods=["GET"])
 def api_admin_data():
     """Get all scraped data for admin panel (from memory + database)."""
-    from scrapy_scraper import scraped_items_by_job, scraping_progress_by_job
+    from scrapy_scraper import get_all_jobs
     
     jobs_data = []
     seen_job_ids = set()
     
     # First, get data from in-memory (current session)
-    for job_id, items in scraped_items_by_job.items():
+    for job_id, progress, items in get_all_jobs():
         seen_job_ids.add(job_id)
-        progress = scraping_progress_by_job.get(job_id, {})
         jobs_data.append({
             "job_id": job_id,
             "status": progress.get("status", "unknown"),
@@ -335,7 +712,7 @@ def api_admin_data():
                         "created_at": job.created_at.isoformat() if job.created_at else None,
                     })
         except Exception as e:
-            print(f"Error loading from DB: {e}")
+            logger.warning("Error loading from DB: %s", e)
     
     return jsonify({"jobs": jobs_data})
 
@@ -343,148 +720,193 @@ def api_admin_data():
 @app.route("/api/admin/export-csv", methods=["GET"])
 def api_admin_export_csv():
     """Export all scraped data as CSV."""
-    from scrapy_scraper import scraped_items_by_job
+    from scrapy_scraper import get_all_jobs
     
     all_items = []
-    for job_id, items in scraped_items_by_job.items():
+    for _job_id, _progress, items in get_all_jobs():
         all_items.extend(items)
     
     if not all_items:
         return Response("No data to export", mimetype="text/plain")
     
     websites = [item.get("website", "") for item in all_items]
-    csv_content = build_csv_from_scraped_data(websites, all_items)
     
-    return Response(
-        csv_content,
-        mimetype="text/csv",
-        headers={"Content-Disposition": "attachment; filename=all_scraped_data.csv"},
-    )
+    return csv_response(iter_csv_rows(websites, all_items), "all_scraped_data.csv")
+
 
+class _Echo:
+    """File-like object whose write() hands the formatted CSV line back to the caller."""
 
-def build_csv_from_scraped_data(websites: List[str], scraped_data: List[dict]) -> str:
-    """Build CSV from already-scraped data."""
-    output = io.StringIO()
-    writer = csv.DictWriter(
-        output,
-        fieldnames=[
-            "website",
-            "lawyer_name",
-            "lawyer_email",
-            "lawyer_phone",
-            "profile_url",
-            "profile_images",
-            "vcard_content",
-            "all_emails",
-            "all_phones",
-            "vcard_links",
-            "vcard_files_count",
-            "pdf_links",
-            "image_links",
-            "lawyer_profiles_count",
-        ],
+    def write(self, value: str) -> str:
+        return value
+
+
+def _list_field(item: dict, key: str) -> list:
+    value = item.get(key)
+    return value if isinstance(value, list) else []
+
+
+def _site_csv_columns(item: dict) -> Tuple[tuple, list]:
+    """
+    Precompute the site-level CSV columns (all_emails .. lawyer_profiles_count)
+    for one scraped item. Returns (columns, lawyer_profiles).
+    """
+    lawyer_profiles = _list_field(item, "lawyer_profiles")
+    columns = (
+        "; ".join(map(str, _list_field(item, "emails"))),
+        "; ".join(map(str, _list_field(item, "phones"))),
+        "; ".join(map(str, _list_field(item, "vcard_links"))),
+        len(_list_field(item, "vcard_files")),
+        "; ".join(map(str, _list_field(item, "pdf_links"))),
+        "; ".join(map(str, _list_field(item, "image_links"))),
+        len(lawyer_profiles),
     )
-    writer.writeheader()
+    return columns, lawyer_profiles
 
-    data_by_url = {item["website"]: item for item in scraped_data if isinstance(item, dict) and item.get("website")}
 
-    for site in websites:
-        data = data_by_url.get(
-            site,
-            {
-                "website": site,
-                "emails": [],
-                "phones": [],
-                "vcard_links": [],
-                "vcard_files": [],
-                "pdf_links": [],
-                "image_links": [],
-                "lawyer_profiles": [],
-            },
-        )
+# Columns for a site with no scraped data.
+_EMPTY_SITE_CSV_COLUMNS: Tuple[tuple, list] = (("", "", "", 0, "", "", 0), [])
+
 
-        emails = data.get("emails", []) if isinstance(data.get("emails"), list) else []
-        phones = data.get("phones", []) if isinstance(data.get("phones"), list) else []
-        vcard_links = data.get("vcard_links", []) if isinstance(data.get("vcard_links"), list) else []
-        vcard_files = data.get("vcard_files", []) if isinstance(data.get("vcard_files"), list) else []
-        pdf_links = data.get("pdf_links", []) if isinstance(data.get("pdf_links"), list) else []
-        image_links = data.get("image_links", []) if isinstance(data.get("image_links"), list) else []
-        lawyer_profiles = data.get("lawyer_profiles", []) if isinstance(data.get("lawyer_profiles"), list) else []
+def iter_csv_rows(websites: List[str], scraped_data: List[dict], include_header: bool = True) -> Iterator[str]:
+    """
+    Yield CSV lines (header first unless include_header=False) for already-scraped data.
+    Rows are produced one at a time so the response can be streamed without
+    holding the whole file in memory.
+    """
+    writer = csv.writer(_Echo())
+    if include_header:
+        yield CSV_HEADER_ROW
+
+    # Join each site's list fields once up front; the row loop then only splices tuples.
+    columns_by_url = {
+        item["website"]: _site_csv_columns(item)
+        for item in scraped_data
+        if isinstance(item, dict) and item.get("website")
+    }
 
+    for site in websites:
+        site_columns, lawyer_profiles = columns_by_url.get(site, _EMPTY_SITE_CSV_COLUMNS)
+
+        # Write one row per lawyer profile
         if lawyer_profiles:
             for profile in lawyer_profiles:
-                writer.writerow(
-                    {
-                        "website": data["website"],
-                        "lawyer_name": profile.get("lawyer_name", ""),
-                        "lawyer_email": profile.get("lawyer_email", ""),
-                        "lawyer_phone": profile.get("lawyer_phone", ""),
-                        "profile_url": profile.get("profile_url", ""),
-                        "profile_images": "; ".join(profile.get("profile_images", [])),
-                        "vcard_content": profile.get("vcard_content", ""),
-                        "all_emails": "; ".join(str(e) for e in emails),
-                        "all_phones": "; ".join(str(p) for p in phones),
-                        "vcard_links": "; ".join(str(v) for v in vcard_links),
-                        "vcard_files_count": len(vcard_files),
-                        "pdf_links": "; ".join(str(p) for p in pdf_links),
-                        "image_links": "; ".join(str(i) for i in image_links),
-                        "lawyer_profiles_count": len(lawyer_profiles),
-                    }
+                yield writer.writerow(
+                    (
+                        site,
+                        profile.get("lawyer_name", ""),
+                        profile.get("lawyer_email", ""),
+                        profile.get("lawyer_phone", ""),
+                        profile.get("profile_url", ""),
+                        "; ".join(profile.get("profile_images", [])),
+                        profile.get("vcard_content", ""),  # Base64 encoded
+                        *site_columns,
+                    )
                 )
         else:
-            writer.writerow(
-                {
-                    "website": data["website"],
-                    "lawyer_name": "",
-                    "lawyer_email": "",
-                    "lawyer_phone": "",
-                    "profile_url": "",
-                    "profile_images": "",
-                    "vcard_content": "",
-                    "all_emails": "; ".join(str(e) for e in emails),
-                    "all_phones": "; ".join(str(p) for p in phones),
-                    "vcard_links": "; ".join(str(v) for v in vcard_links),
-                    "vcard_files_count": len(vcard_files),
-                    "pdf_links": "; ".join(str(p) for p in pdf_links),
-                    "image_links": "; ".join(str(i) for i in image_links),
-                    "lawyer_profiles_count": 0,
-                }
-            )
+            # No profiles found, write firm-level data
+            yield writer.writerow((site, "", "", "", "", "", "", *site_columns))
+
+
+# Target size of each streamed CSV body chunk (rows are coalesced up to this),
+# and the longest a row is held back waiting for that size to be reached.
+CSV_STREAM_CHUNK_SIZE = 256 * 1024
+CSV_STREAM_MAX_DELAY = 1.0  # seconds
 
-    return output.getvalue()
+
+def _coalesce_chunks(
+    chunks: Iterator[str], size: int = CSV_STREAM_CHUNK_SIZE, max_delay: float = CSV_STREAM_MAX_DELAY
+) -> Iterator[str]:
+    """
+    Join small text chunks into pieces of roughly `size` characters to cut per-write
+    overhead in the WSGI server and compressor. The first chunk (the CSV header) is
+    passed through immediately so the download still starts right away, and held
+    rows are also sent once the oldest has waited `max_delay` seconds.
+    """
+    chunks = iter(chunks)
+    for first in chunks:
+        yield first
+        break
+
+    pending: List[str] = []
+    pending_len = 0
+    pending_since = 0.0
+    for chunk in chunks:
+        if not pending:
+            pending_since = time.monotonic()
+        pending.append(chunk)
+        pending_len += len(chunk)
+        if pending_len >= size or time.monotonic() - pending_since >= max_delay:
+            yield "".join(pending)
+            pending.clear()
+            pending_len = 0
+    if pending:
+        yield "".join(pending)
+
+
+def _gzip_chunks(chunks: Iterator[str]) -> Iterator[bytes]:
+    """
+    Gzip-compress a stream of text chunks incrementally. Each chunk ends with a
+    sync flush; otherwise zlib keeps the text buffered and the client gets only
+    the gzip header until the stream ends. Chunks arrive already coalesced
+    (see _coalesce_chunks), so the flushes cost little compression.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        yield compressor.compress(chunk.encode("utf-8")) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def csv_response(rows: Iterator[str], filename: str) -> Response:
+    """
+    Stream CSV lines as a download, gzip-encoded on the fly when the client accepts it.
+    """
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "Vary": "Accept-Encoding",
+    }
+    rows = _coalesce_chunks(rows)
+    if "gzip" in request.accept_encodings:
+        headers["Content-Encoding"] = "gzip"
+        rows = _gzip_chunks(rows)
+    return Response(rows, mimetype="text/csv", headers=headers)
 
 
 @app.route("/download/<job_id>.csv", methods=["GET"])
 def download_job_csv(job_id: str):
     """Download CSV for a completed scrape job."""
-    urls = get_job_urls(job_id)
-    items = get_scraped_items(job_id)
-    csv_data = build_csv_from_scraped_data(urls, items)
+    urls, items = get_any_job_data(job_id)
     filename = f"law_firms_{job_id}.csv"
-    return Response(
-        csv_data,
-        mimetype="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
+    return csv_response(iter_csv_rows(urls, items), filename)
 
 @app.route("/import-list", methods=["POST"])
 def import_list():
     """API endpoint to import URLs from external lists (WSJ, SuperLawyers, etc.)"""
     try:
-        data = request.get_json(silent=True) or {}
+        data = _get_json_body()
+        if data is None:
+            return jsonify({"error": "invalid JSON"}), 400
         list_url = str(data.get("listUrl", "")).strip()
         list_text = str(data.get("listText", "")).strip()
+        list_urls = data.get("listUrls") or []
+        if not isinstance(list_urls, list):
+            return jsonify({"error": "listUrls must be a list"}), 400
+        list_urls = [str(u).strip() for u in list_urls if str(u).strip()]
 
-        if not list_url and not list_text:
+        if not list_url and not list_text and not list_urls:
             return (
                 jsonify({"error": "Please provide either a list URL or list text"}),
                 400,
             )
 
-        urls, count = search_from_list(
-            list_url=list_url if list_url else None,
-            list_text=list_text if list_text else None,
-        )
+        if list_urls:
+            # Several list pages: fetched in parallel, merged in the given order.
+            urls, count = search_from_lists(([list_url] if list_url else []) + list_urls)
+        else:
+            urls, count = search_from_list(
+                list_url=list_url if list_url else None,
+                list_text=list_text if list_text else None,
+            )
 
         return jsonify(
             {
@@ -498,159 +920,57 @@ def import_list():
         return jsonify({"error": str(e)}), 500
 
 
-def build_csv_for_websites(websites: List[str]) -> str:
+def build_csv_for_websites(websites: List[str], already_normalized: bool = False) -> Iterator[str]:
     """
-    Scrape all given websites using Scrapy and return a CSV string with the results.
+    Scrape all given websites using Scrapy and return an iterator over CSV lines.
     This now uses Scrapy for concurrent, efficient scraping.
     Creates multiple rows per website: one for each lawyer profile found.
+    The header line is yielded before scraping starts so the download begins
+    immediately; the scrape itself runs when the iterator is first advanced
+    past the header.
+    Pass already_normalized=True when the URLs went through normalize_url upstream
+    (e.g. job URLs from api_start_scrape) to skip re-normalizing them.
     """
-    output = io.StringIO()
-    writer = csv.DictWriter(
-        output,
-        fieldnames=[
-            "website",
-            "lawyer_name",
-            "lawyer_email",
-            "lawyer_phone",
-            "profile_url",
-            "profile_images",
-            "vcard_content",
-            "all_emails",
-            "all_phones",
-            "vcard_links",
-            "vcard_files_count",
-            "pdf_links",
-            "image_links",
-            "lawyer_profiles_count",
-        ],
-    )
-    writer.writeheader()
-
     # Normalize/dedupe input websites (keep original order)
-    normalized_websites: List[str] = []
-    seen_sites: set[str] = set()
-    for w in websites:
-        n = normalize_url(w) or w
-        if n not in seen_sites:
-            seen_sites.add(n)
-            normalized_websites.append(n)
+    if already_normalized:
+        normalized_websites: List[str] = list(dict.fromkeys(websites))
+    else:
+        normalized_websites = list(dict.fromkeys(normalize_url(w) or w for w in websites))
+
+    return _iter_scraped_csv(normalized_websites)
+
+
+def _iter_scraped_csv(websites: List[str]) -> Iterator[str]:
+    """Yield the CSV header, scrape websites with Scrapy, then yield the data rows."""
+    yield CSV_HEADER_ROW
 
     # Use Scrapy to scrape websites concurrently
-    websites = normalized_websites
-    print(f"Starting to scrape {len(websites)} website(s)...")
-    print(f"URLs to scrape: {websites}")
+    logger.info("Starting to scrape %d website(s)", len(websites))
+    logger.debug("URLs to scrape: %r", websites)
     try:
         scraped_data = scrape_websites_with_scrapy(websites)
-        print(f"Scraping completed. Found data for {len(scraped_data)} website(s).")
-        if scraped_data:
+        logger.info("Scraping completed. Found data for %d website(s)", len(scraped_data))
+        if not scraped_data:
+            logger.warning("No data was scraped for %d website(s)", len(websites))
+        elif logger.isEnabledFor(logging.DEBUG):
             sample = scraped_data[0] or {}
-            print(
-                "Sample item summary: "
-                f"website={sample.get('website')}, "
-                f"emails={len(sample.get('emails') or [])}, "
-                f"phones={len(sample.get('phones') or [])}, "
-                f"profiles={len(sample.get('lawyer_profiles') or [])}, "
-                f"vcards={len(sample.get('vcard_files') or [])}"
+            logger.debug(
+                "Sample item summary: website=%s, emails=%d, phones=%d, profiles=%d, vcards=%d",
+                sample.get("website"),
+                len(sample.get("emails") or []),
+                len(sample.get("phones") or []),
+                len(sample.get("lawyer_profiles") or []),
+                len(sample.get("vcard_files") or []),
             )
-        else:
-            print("WARNING: No data was scraped!")
-    except Exception as e:
-        print(f"Error during scraping: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error during scraping")
         scraped_data = []
     
-    # Create a dict mapping URLs to scraped data for quick lookup
-    data_by_url = {item['website']: item for item in scraped_data}
-    
-    # Write results - create one row per lawyer profile, or one row for firm-level data if no profiles
-    for site in websites:
-        data = data_by_url.get(site, {
-            'website': site,
-            'emails': [],
-            'phones': [],
-            'vcard_links': [],
-            'vcard_files': [],
-            'pdf_links': [],
-            'image_links': [],
-            'lawyer_profiles': [],
-        })
-        
-        # Ensure all fields are lists
-        emails = data.get("emails", []) if isinstance(data.get("emails"), list) else []
-        phones = data.get("phones", []) if isinstance(data.get("phones"), list) else []
-        vcard_links = data.get("vcard_links", []) if isinstance(data.get("vcard_links"), list) else []
-        vcard_files = data.get("vcard_files", []) if isinstance(data.get("vcard_files"), list) else []
-        pdf_links = data.get("pdf_links", []) if isinstance(data.get("pdf_links"), list) else []
-        image_links = data.get("image_links", []) if isinstance(data.get("image_links"), list) else []
-        lawyer_profiles = data.get("lawyer_profiles", []) if isinstance(data.get("lawyer_profiles"), list) else []
-        
-        # Write one row per lawyer profile
-        if lawyer_profiles:
-            for profile in lawyer_profiles:
-                writer.writerow(
-                    {
-                        "website": data["website"],
-                        "lawyer_name": profile.get("lawyer_name", ""),
-                        "lawyer_email": profile.get("lawyer_email", ""),
-                        "lawyer_phone": profile.get("lawyer_phone", ""),
-                        "profile_url": profile.get("profile_url", ""),
-                        "profile_images": "; ".join(profile.get("profile_images", [])),
-                        "vcard_content": profile.get("vcard_content", ""),  # Base64 encoded
-                        "all_emails": "; ".join(str(e) for e in emails),
-                        "all_phones": "; ".join(str(p) for p in phones),
-                        "vcard_links": "; ".join(str(v) for v in vcard_links),
-                        "vcard_files_count": len(vcard_files),
-                        "pdf_links": "; ".join(str(p) for p in pdf_links),
-                        "image_links": "; ".join(str(i) for i in image_links),
-                        "lawyer_profiles_count": len(lawyer_profiles),
-                    }
-                )
-        else:
-            # No profiles found, write firm-level data
-            writer.writerow(
-                {
-                    "website": data["website"],
-                    "lawyer_name": "",
-                    "lawyer_email": "",
-                    "lawyer_phone": "",
-                    "profile_url": "",
-                    "profile_images": "",
-                    "vcard_content": "",
-                    "all_emails": "; ".join(str(e) for e in emails),
-                    "all_phones": "; ".join(str(p) for p in phones),
-                    "vcard_links": "; ".join(str(v) for v in vcard_links),
-                    "vcard_files_count": len(vcard_files),
-                    "pdf_links": "; ".join(str(p) for p in pdf_links),
-                    "image_links": "; ".join(str(i) for i in image_links),
-                    "lawyer_profiles_count": 0,
-                }
-            )
-
-    return output.getvalue()
+    yield from iter_csv_rows(websites, scraped_data, include_header=False)
 
 
 @app.route("/", methods=["GET", "POST"])
 def index():
-    # Practice areas for lawyers
-    practice_areas = [
-        "Criminal Law",
-        "Corporate Law",
-        "Family Law",
-        "Personal Injury",
-        "Real Estate Law",
-        "Immigration Law",
-        "Intellectual Property",
-        "Employment Law",
-        "Tax Law",
-        "Estate Planning",
-        "Bankruptcy Law",
-        "Medical Malpractice",
-        "Immigration",
-        "DUI/DWI",
-        "Workers Compensation",
-    ]
-
     selected_practice_area = ""
     selected_location = ""
     selected_city = ""
@@ -663,13 +983,15 @@ def index():
     error: str | None = None
 
     if request.method == "POST":
-        selected_practice_area = request.form.get("practice_area", "").strip()
-        location_input = request.form.get("location", "").strip()
-        selected_city = request.form.get("city", "").strip()
-        selected_state = request.form.get("state", "").strip()
-        selected_country = request.form.get("country", "").strip()
-        page_str = request.form.get("page") or "1"
-        action = request.form.get("action", "search")
+        # Strip every single-valued field once (selected_urls is read separately via getlist).
+        form = {k: v.strip() for k, v in request.form.items()}
+        selected_practice_area = form.get("practice_area", "")
+        location_input = form.get("location", "")
+        selected_city = form.get("city", "")
+        selected_state = form.get("state", "")
+        selected_country = form.get("country", "")
+        page_str = form.get("page") or "1"
+        action = form.get("action", "search")
 
         try:
             page = max(int(page_str), 1)
@@ -679,6 +1001,9 @@ def index():
         try:
             if not selected_practice_area:
                 error = "Please select a practice area."
+            elif selected_practice_area not in _PRACTICE_AREAS_SET:
+                # Reject unknown values before spending Google CSE quota on them.
+                error = "Please select a valid practice area."
             else:
                 # Use the simplified location field if provided, otherwise combine individual fields
                 if location_input:
@@ -704,42 +1029,42 @@ def index():
                 )
                 if action == "scrape" and websites:
                     # Get selected URLs from form
-                    selected_urls = request.form.getlist("selected_urls")
+                    selected_urls = list(dict.fromkeys(request.form.getlist("selected_urls")))
                     if not selected_urls:
                         error = "Please select at least one law firm website to scrape."
+                    elif DB_AVAILABLE and is_celery_available():
+                        # Hand the scrape to a Celery worker and let the progress
+                        # page poll it, instead of holding this request open.
+                        job_id = start_job(selected_urls)
+                        _clear_jobs_cache()
+                        return redirect(url_for("progress_page", job_id=job_id))
                     else:
                         # Reset progress before starting
                         reset_progress()
-                        csv_data = build_csv_for_websites(selected_urls)
-                        filename = f"law_firms_{selected_practice_area.replace(' ', '_').lower()}_{location_str.replace(' ', '_').lower() or 'all'}.csv"
-                        return Response(
-                            csv_data,
-                            mimetype="text/csv",
-                            headers={
-                                "Content-Disposition": f"attachment; filename={filename}"
-                            },
-                        )
+                        csv_rows = build_csv_for_websites(selected_urls, already_normalized=True)
+                        filename = f"law_firms_{_PRACTICE_AREA_SLUGS[selected_practice_area]}_{location_str.translate(_SLUG_TABLE).lower() or 'all'}.csv"
+                        return csv_response(csv_rows, filename)
                 elif action == "export" and websites:
-                    csv_data = build_csv_for_websites(websites)
-                    filename = f"law_firms_{selected_practice_area.replace(' ', '_').lower()}.csv"
-                    return Response(
-                        csv_data,
-                        mimetype="text/csv",
-                        headers={
-                            "Content-Disposition": f"attachment; filename={filename}"
-                        },
+                    csv_rows = build_csv_for_websites(websites, already_normalized=True)
+                    filename = f"law_firms_{_PRACTICE_AREA_SLUGS[selected_practice_area]}.csv"
+                    return csv_response(csv_rows, filename)
+                elif action == "export_all" and websites:
+                    all_websites, _ = fetch_all_pages(
+                        selected_practice_area, "", location_str, selected_country, ""
                     )
+                    csv_rows = build_csv_for_websites(all_websites, already_normalized=True)
+                    filename = f"law_firms_{_PRACTICE_AREA_SLUGS[selected_practice_area]}_all_pages.csv"
+                    return csv_response(csv_rows, filename)
         except Exception as exc:  # noqa: BLE001
             error = f"Failed to fetch law firm websites: {exc}"
 
-    page_size = 10
     total_pages = (
-        (total_results + page_size - 1) // page_size if total_results is not None else None
+        (total_results + CSE_PAGE_SIZE - 1) // CSE_PAGE_SIZE if total_results is not None else None
     )
 
     return render_template(
         "index.html",
-        practice_areas=practice_areas,
+        practice_areas=PRACTICE_AREAS,
         selected_practice_area=selected_practice_area,
         selected_location=selected_location,
         selected_city=selected_city,
@@ -9,6 +9,15 @@ from celery import Celery
 # Redis configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+# Worker processes. Each scrape task runs its own multi-request Scrapy crawl,
+# so scale with the host's cores rather than a fixed 2; override with
+# CELERY_CONCURRENCY. (gevent/eventlet pools are not an option: every task
+# needs a Twisted reactor of its own, i.e. its own process.)
+try:
+    WORKER_CONCURRENCY = max(1, int(os.getenv("CELERY_CONCURRENCY", "")))
+except ValueError:
+    WORKER_CONCURRENCY = max(2, os.cpu_count() or 2)
+
 # Create Celery app
 celery_app = Celery(
     "legalscrape",
@@ -34,7 +43,8 @@ celery_app.conf.update(
 
     # Worker settings
     worker_prefetch_multiplier=1,  # One task at a time per worker
-    worker_concurrency=2,  # 2 concurrent workers
+    worker_concurrency=WORKER_CONCURRENCY,
+    worker_max_tasks_per_child=1,  # Fresh process per scrape (Twisted reactor is single-use)
 
     # Result settings
     result_expires=86400,  # Results expire after 24 hours
@@ -3,11 +3,12 @@ Celery tasks for background scraping jobs.
 """
 
 import logging
+import os
 from typing import List, Dict, Any
 from datetime import datetime
 
-from celery import current_task
 from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_init
 
 from celery_config import celery_app
 from database import (
@@ -16,87 +17,51 @@ from database import (
     save_scraped_item,
     get_job,
     clear_expired_cache as db_clear_cache,
+    init_db,
 )
 
 logger = logging.getLogger(__name__)
 
 
+@worker_init.connect
+def _init_database(**kwargs):
+    """Create tables once in the main worker process; pool children inherit it."""
+    init_db()
+
+
 @celery_app.task(bind=True, max_retries=2)
-def scrape_websites_task(self, job_id: str, urls: List[str]) -> Dict[str, Any]:
+def scrape_websites_task(
+    self, job_id: str, urls: List[str], settings_overrides: Dict[str, Any] | None = None
+) -> Dict[str, Any]:
     """
     Background task to scrape multiple websites.
     Uses Scrapy with optional Playwright for JS rendering.
+    settings_overrides are Scrapy settings for this job only (see start_scrape_job).
+
+    The crawl runs on this worker process's own reactor through CrawlerProcess.
+    A Twisted reactor cannot be restarted, so celery_config recycles the worker
+    child after every task (worker_max_tasks_per_child=1).
     """
-    from scrapy.crawler import CrawlerRunner
-    from scrapy.utils.log import configure_logging
-    from twisted.internet import reactor, defer
+    from scrapy.crawler import CrawlerProcess
     from spiders.website_spider import WebsiteSpider
-    import threading
 
     # Update job status
-    update_job(job_id, status="running", message="Starting scrape...")
-
-    results = []
-    errors = []
+    update_job(
+        job_id,
+        status="running",
+        message=f"Scraping {len(urls)} website(s)...",
+    )
 
     try:
-        configure_logging(install_root_handler=False)
-
-        # Build Scrapy settings
-        settings = _build_scrapy_settings()
-        runner = CrawlerRunner(settings)
-
-        # Track progress
-        completed = 0
-        url_status = {url: "pending" for url in urls}
-
-        def item_callback(item: Dict[str, Any], spider):
-            """Called when an item is scraped."""
-            nonlocal completed
-            website = item.get("website", "")
-            
-            # Save to database
-            save_scraped_item(job_id, item)
-            results.append(item)
-
-            # Update status
-            if website in url_status:
-                url_status[website] = "completed"
-                completed += 1
-                update_job(
-                    job_id,
-                    completed=completed,
-                    message=f"Scraped {completed}/{len(urls)} websites",
-                    url_status=url_status,
-                )
-
-        @defer.inlineCallbacks
-        def crawl_all():
-            for url in urls:
-                url_status[url] = "scraping"
-                update_job(job_id, url_status=url_status, message=f"Scraping {url}...")
-
-                try:
-                    yield runner.crawl(
-                        WebsiteSpider,
-                        start_urls=[url],
-                        job_id=job_id,
-                        item_callback=item_callback,
-                    )
-                except Exception as e:
-                    logger.error(f"Error scraping {url}: {e}")
-                    url_status[url] = "error"
-                    errors.append({"url": url, "error": str(e)})
-
-        def run_in_thread():
-            d = crawl_all()
-            d.addBoth(lambda _: reactor.stop())
-            reactor.run(installSignalHandlers=False)
-
-        # Run in separate thread to not block Celery worker
-        thread = threading.Thread(target=run_in_thread)
-        thread.start()
-        thread.join(timeout=3600)  # 1 hour timeout
+        process = CrawlerProcess(_build_scrapy_settings(settings_overrides), install_root_handler=False)
+        # One crawl for all URLs; ItemsCollectorPipeline aggregates pages per site
+        # and saves the final items to the database when the spider closes.
+        process.crawl(WebsiteSpider, urls=urls, job_id=job_id, persist_url_status=True)
+        process.start(stop_after_crawl=True, install_signal_handlers=False)
+
+        from scrapy_scraper import get_scraped_items
+        results = get_scraped_items(job_id)
+        scraped_sites = {item.get("website") for item in results}
 
         # Update final status
         update_job(
@@ -104,7 +69,7 @@ def scrape_websites_task(self, job_id: str, urls: List[str]) -> Dict[str, Any]:
             status="completed",
             completed=len(urls),
             message=f"Completed! Scraped {len(results)} websites.",
-            url_status=url_status,
+            url_status={url: "completed" if url in scraped_sites else "error" for url in urls},
         )
 
         return {
@@ -112,7 +77,7 @@ def scrape_websites_task(self, job_id: str, urls: List[str]) -> Dict[str, Any]:
             "status": "completed",
             "total": len(urls),
             "scraped": len(results),
-            "errors": len(errors),
+            "errors": len(urls) - len(scraped_sites & set(urls)),
         }
 
     except SoftTimeLimitExceeded:
@@ -134,32 +99,52 @@ def scrape_single_website_task(job_id: str, url: str) -> Dict[str, Any]:
 @celery_app.task
 def clear_expired_cache_task():
     """Periodic task to clear expired search cache."""
-    db_clear_cache()
-    return {"status": "ok", "timestamp": datetime.utcnow().isoformat()}
+    removed = db_clear_cache()
+    return {"status": "ok", "removed": removed, "timestamp": datetime.utcnow().isoformat()}
 
 
-def _build_scrapy_settings() -> dict:
+def _build_scrapy_settings(settings_overrides: Dict[str, Any] | None = None) -> dict:
     """Build Scrapy settings with Playwright support if available."""
+    # Same AutoThrottle derivation as the in-process scraper
+    from scrapy_scraper import _autothrottle_target, _with_derived_autothrottle
+
+    per_domain = int(os.getenv("SCRAPY_CONCURRENT_REQUESTS_PER_DOMAIN", "8"))
     settings = {
         "LOG_LEVEL": "INFO",
         "ROBOTSTXT_OBEY": True,
-        "DOWNLOAD_DELAY": 0.5,
-        "CONCURRENT_REQUESTS": 16,
-        "CONCURRENT_REQUESTS_PER_DOMAIN": 4,
+        "DOWNLOAD_DELAY": float(os.getenv("SCRAPY_DOWNLOAD_DELAY", "0")),
+        "CONCURRENT_REQUESTS": int(os.getenv("SCRAPY_CONCURRENT_REQUESTS", "32")),
+        "CONCURRENT_REQUESTS_PER_DOMAIN": per_domain,
+        "CONCURRENT_ITEMS": int(os.getenv("SCRAPY_CONCURRENT_ITEMS", "100")),
         "AUTOTHROTTLE_ENABLED": True,
         "AUTOTHROTTLE_START_DELAY": 1,
         "AUTOTHROTTLE_MAX_DELAY": 10,
-        "AUTOTHROTTLE_TARGET_CONCURRENCY": 4.0,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": _autothrottle_target(per_domain),
         "COOKIES_ENABLED": True,
         "RETRY_ENABLED": True,
         "RETRY_TIMES": 2,
+        "DNS_RESOLVER": "scrapy.resolver.CachingThreadedResolver",
+        "DNSCACHE_ENABLED": True,
+        "DNSCACHE_SIZE": 10000,
+        "DNS_TIMEOUT": 10,
         "DEPTH_LIMIT": 3,
         "DEPTH_PRIORITY": 1,
         "SCHEDULER_DISK_QUEUE": "scrapy.squeues.PickleFifoDiskQueue",
         "SCHEDULER_MEMORY_QUEUE": "scrapy.squeues.FifoMemoryQueue",
+        "SCHEDULER_PRIORITY_QUEUE": "scrapy.pqueues.DownloaderAwarePriorityQueue",
+        "REACTOR_THREADPOOL_MAXSIZE": 40,
+        "ITEM_PIPELINES": {"scrapy_scraper.ItemsCollectorPipeline": 300},
         "USER_AGENT": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+        "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
     }
 
+    # Run the asyncio reactor on uvloop if available
+    try:
+        import uvloop  # noqa: F401
+        settings["ASYNCIO_EVENT_LOOP"] = "uvloop.Loop"
+    except ImportError:
+        pass
+
     # Add Playwright settings if available
     try:
         import scrapy_playwright
@@ -168,7 +153,6 @@ def _build_scrapy_settings() -> dict:
                 "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
                 "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
             },
-            "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
             "PLAYWRIGHT_BROWSER_TYPE": "chromium",
             "PLAYWRIGHT_LAUNCH_OPTIONS": {
                 "headless": True,
@@ -179,4 +163,7 @@ def _build_scrapy_settings() -> dict:
     except ImportError:
         pass
 
+    if settings_overrides:
+        settings.update(_with_derived_autothrottle(settings_overrides))
+
     return settings
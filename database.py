@@ -3,10 +3,15 @@ Database models and utilities using SQLAlchemy with SQLite.
 Provides persistence for jobs, scraped items, and search cache.
 """
 
+import hashlib
 import json
 import os
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from sqlalchemy import (
     Boolean,
@@ -14,13 +19,42 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     String,
     Text,
+    bindparam,
     create_engine,
+    delete,
+    event,
     func,
+    inspect,
+    select,
+    update,
 )
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker, scoped_session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import (
+    declarative_base,
+    deferred,
+    relationship,
+    scoped_session,
+    sessionmaker,
+    undefer_group,
+)
+
+# orjson (C extension) for the JSON payload columns; stdlib json as a fallback.
+try:
+    import orjson
+
+    def _dumps(value: Any) -> str:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///legalscrape.db")
@@ -31,8 +65,27 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
     pool_pre_ping=True,
     echo=False,
+    json_serializer=_dumps,
+    json_deserializer=_loads,
+    query_cache_size=2000,
 )
 
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL lets readers proceed while a writer commits; NORMAL sync skips most fsyncs."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        cursor.execute("PRAGMA busy_timeout=5000")
+        # Takes effect for new database files (or after the next full VACUUM).
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.close()
+
+
 # Session factory
 session_factory = sessionmaker(bind=engine)
 Session = scoped_session(session_factory)
@@ -54,8 +107,14 @@ class Job(Base):
     total_urls = Column(Integer, default=0)
     completed_urls = Column(Integer, default=0)
     message = Column(Text, nullable=True)
-    urls_json = Column(Text, default="[]")  # JSON array of URLs
-    url_status_json = Column(Text, default="{}")  # JSON dict of URL -> status
+    # Decoded once when the row is loaded and kept on the instance, so repeated
+    # access (and to_dict) never re-parses the JSON text.
+    # Deferred: job listings never read these (potentially large) blobs;
+    # get_job() loads them explicitly.
+    urls = deferred(Column("urls_json", JSON, default=list), group="payload")  # JSON array of URLs
+    url_status = deferred(
+        Column("url_status_json", JSON, default=dict), group="payload"
+    )  # JSON dict of URL -> status (non-pending only)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
@@ -63,31 +122,17 @@ class Job(Base):
     # Relationship to scraped items
     items = relationship("ScrapedItem", back_populates="job", cascade="all, delete-orphan")
 
-    @property
-    def urls(self) -> List[str]:
-        return json.loads(self.urls_json) if self.urls_json else []
-
-    @urls.setter
-    def urls(self, value: List[str]):
-        self.urls_json = json.dumps(value)
-
-    @property
-    def url_status(self) -> Dict[str, str]:
-        return json.loads(self.url_status_json) if self.url_status_json else {}
-
-    @url_status.setter
-    def url_status(self, value: Dict[str, str]):
-        self.url_status_json = json.dumps(value)
-
     def to_dict(self) -> Dict[str, Any]:
+        urls = self.urls or []
+        url_status = self.url_status or {}
         return {
             "id": self.id,
             "status": self.status,
             "total": self.total_urls,
             "completed": self.completed_urls,
             "message": self.message,
-            "urls": self.urls,
-            "url_status": self.url_status,
+            "urls": urls,
+            "url_status": {url: url_status.get(url, "pending") for url in urls},
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
@@ -97,14 +142,20 @@ class Job(Base):
 class ScrapedItem(Base):
     """Scraped data item (one per website)."""
     __tablename__ = "scraped_items"
+    __table_args__ = (
+        # One row per site per job; also the conflict target for upserts.
+        Index("ix_item_job_website", "job_id", "website", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     job_id = Column(String(64), ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
     website = Column(String(500), nullable=False)
-    emails_json = Column(Text, default="[]")
-    phones_json = Column(Text, default="[]")
-    profiles_json = Column(Text, default="[]")  # List of lawyer profiles
-    vcard_data_json = Column(Text, default="{}")  # Dict of vCard data
+    # JSON columns (JSON1 text on SQLite) decoded by SQLAlchemy; the physical
+    # column names keep their old "_json" suffix so existing databases still work.
+    emails = Column("emails_json", JSON, default=list)
+    phones = Column("phones_json", JSON, default=list)
+    profiles = Column("profiles_json", JSON, default=list)  # List of lawyer profiles
+    vcard_data = Column("vcard_data_json", JSON, default=dict)  # Dict of vCard data
     pages_visited = Column(Integer, default=0)
     profiles_found = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -112,45 +163,13 @@ class ScrapedItem(Base):
 
     job = relationship("Job", back_populates="items")
 
-    @property
-    def emails(self) -> List[str]:
-        return json.loads(self.emails_json) if self.emails_json else []
-
-    @emails.setter
-    def emails(self, value: List[str]):
-        self.emails_json = json.dumps(value)
-
-    @property
-    def phones(self) -> List[str]:
-        return json.loads(self.phones_json) if self.phones_json else []
-
-    @phones.setter
-    def phones(self, value: List[str]):
-        self.phones_json = json.dumps(value)
-
-    @property
-    def profiles(self) -> List[Dict]:
-        return json.loads(self.profiles_json) if self.profiles_json else []
-
-    @profiles.setter
-    def profiles(self, value: List[Dict]):
-        self.profiles_json = json.dumps(value)
-
-    @property
-    def vcard_data(self) -> Dict:
-        return json.loads(self.vcard_data_json) if self.vcard_data_json else {}
-
-    @vcard_data.setter
-    def vcard_data(self, value: Dict):
-        self.vcard_data_json = json.dumps(value)
-
     def to_dict(self) -> Dict[str, Any]:
         return {
             "website": self.website,
-            "emails": self.emails,
-            "phones": self.phones,
-            "lawyer_profiles": self.profiles,
-            "vcard_data": self.vcard_data,
+            "emails": self.emails or [],
+            "phones": self.phones or [],
+            "lawyer_profiles": self.profiles or [],
+            "vcard_data": self.vcard_data or {},
             "pages_visited": self.pages_visited,
             "profiles_found": self.profiles_found,
         }
@@ -167,18 +186,10 @@ class SearchCache(Base):
     location = Column(String(200), nullable=True)
     country = Column(String(100), nullable=True)
     page = Column(Integer, default=1)
-    results_json = Column(Text, default="[]")  # List of website URLs
+    results = Column("results_json", JSON, default=list)  # List of website URLs
     total_results = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
-    expires_at = Column(DateTime, nullable=False)
-
-    @property
-    def results(self) -> List[str]:
-        return json.loads(self.results_json) if self.results_json else []
-
-    @results.setter
-    def results(self, value: List[str]):
-        self.results_json = json.dumps(value)
+    expires_at = Column(DateTime, nullable=False, index=True)
 
     @property
     def is_expired(self) -> bool:
@@ -190,9 +201,52 @@ class SearchCache(Base):
 # =============================================================================
 
 
+_initialized = False
+_init_lock = threading.Lock()
+
+
 def init_db():
-    """Initialize database tables."""
-    Base.metadata.create_all(engine)
+    """
+    Initialize database tables (once per process). Not run at import: the web
+    app and the Celery worker call it at startup.
+    """
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        Base.metadata.create_all(engine)
+        _ensure_indexes()
+        _initialized = True
+
+
+def _ensure_indexes():
+    """
+    Create indexes added after a table was first created (create_all skips
+    existing tables). Duplicate (job_id, website) rows are collapsed to the
+    newest one first so the unique item index can be built.
+    """
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in (ScrapedItem.__table__, SearchCache.__table__):
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                if index.name == "ix_item_job_website":
+                    newest_ids = select(func.max(ScrapedItem.id)).group_by(
+                        ScrapedItem.job_id, ScrapedItem.website
+                    )
+                    conn.execute(delete(ScrapedItem).where(ScrapedItem.id.not_in(newest_ids)))
+                index.create(conn)
+
+
+def _upsert_insert(model):
+    """INSERT construct supporting on_conflict_do_update() for the engine's dialect."""
+    if engine.dialect.name == "postgresql":
+        return pg_insert(model)
+    return sqlite_insert(model)
 
 
 def get_session():
@@ -205,6 +259,122 @@ def close_session():
     Session.remove()
 
 
+@contextmanager
+def read_conn() -> Iterator[Any]:
+    """Plain Core connection for read-only queries (no Session/unit-of-work)."""
+    with engine.connect() as conn:
+        yield conn
+
+
+# -----------------------------------------------------------------------------
+# Single writer
+# -----------------------------------------------------------------------------
+# SQLite allows one writer at a time. Rather than having threads contend for
+# the write lock (SQLITE_BUSY + busy_timeout waits), write operations are
+# handed to one thread, which commits everything queued when it wakes up as a
+# single transaction (group commit). Callers still block until their write is
+# committed, so read-after-write behaviour is unchanged.
+
+_WRITE_BATCH_MAX = 100
+_write_queue: "queue.SimpleQueue[Tuple[Callable[[Any], Any], Future, bool]]" = queue.SimpleQueue()
+_writer_lock = threading.Lock()
+_writer_pid: Optional[int] = None
+
+
+def _execute_writes(ops: List[Callable[[Any], Any]]) -> List[Any]:
+    """Run each op(session) in one transaction and return their results."""
+    session = session_factory()
+    try:
+        results = [op(session) for op in ops]
+        session.commit()
+        return results
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def _execute_autocommit(op: Callable[[Any], Any]) -> Any:
+    """Run op(conn) on an AUTOCOMMIT connection, for statements such as VACUUM."""
+    with engine.connect() as conn:
+        return op(conn.execution_options(isolation_level="AUTOCOMMIT"))
+
+
+def _writer_loop() -> None:
+    pending = None
+    while True:
+        first, pending = pending or _write_queue.get(), None
+        if first[2]:
+            # Autocommit ops can't share the batch transaction; run them alone.
+            try:
+                first[1].set_result(_execute_autocommit(first[0]))
+            except Exception as exc:
+                first[1].set_exception(exc)
+            continue
+        batch = [first]
+        while len(batch) < _WRITE_BATCH_MAX:
+            try:
+                item = _write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[2]:
+                pending = item
+                break
+            batch.append(item)
+        try:
+            results = _execute_writes([op for op, _, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                batch[0][1].set_exception(exc)
+                continue
+            # One op spoiled the shared transaction; retry each alone so only it fails.
+            for op, future, _ in batch:
+                try:
+                    future.set_result(_execute_writes([op])[0])
+                except Exception as op_exc:
+                    future.set_exception(op_exc)
+            continue
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+
+def _ensure_writer() -> None:
+    """Start the writer thread (again after a fork, e.g. in Celery prefork children)."""
+    global _writer_pid
+    if _writer_pid == os.getpid():
+        return
+    with _writer_lock:
+        if _writer_pid != os.getpid():
+            threading.Thread(target=_writer_loop, name="db-writer", daemon=True).start()
+            _writer_pid = os.getpid()
+
+
+def _submit_write(op: Callable[[Any], Any], autocommit: bool = False) -> Future:
+    """
+    Queue op for the writer without waiting; the Future holds its result or error.
+    Other databases have no writer thread and run op before returning.
+    """
+    future: Future = Future()
+    if engine.dialect.name != "sqlite":
+        try:
+            future.set_result(_execute_autocommit(op) if autocommit else _execute_writes([op])[0])
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+    _ensure_writer()
+    _write_queue.put((op, future, autocommit))
+    return future
+
+
+def _run_write(op: Callable[[Any], Any], autocommit: bool = False) -> Any:
+    """
+    Run op(session) in a committed write transaction and return its result.
+    With autocommit=True, op(conn) runs alone on an AUTOCOMMIT connection instead.
+    """
+    return _submit_write(op, autocommit).result()
+
+
 # -----------------------------------------------------------------------------
 # Job Operations
 # -----------------------------------------------------------------------------
@@ -212,8 +382,7 @@ def close_session():
 
 def create_job(job_id: str, urls: List[str]) -> Job:
     """Create a new scraping job."""
-    session = get_session()
-    try:
+    def op(session):
         job = Job(
             id=job_id,
             status="pending",
@@ -222,22 +391,24 @@ def create_job(job_id: str, urls: List[str]) -> Job:
             message="Job created",
         )
         job.urls = urls
-        job.url_status = {url: "pending" for url in urls}
+        # Stored sparsely: URLs without an entry are "pending" (see to_dict), so
+        # the status blob starts empty instead of repeating every URL.
+        job.url_status = {}
         session.add(job)
-        session.commit()
         return job
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        close_session()
+
+    return _run_write(op)
+
+
+# Hot lookups are built once at import; only the bound values change per call.
+_SELECT_JOB = select(Job).options(undefer_group("payload")).where(Job.id == bindparam("job_id"))
 
 
 def get_job(job_id: str) -> Optional[Job]:
     """Get a job by ID."""
     session = get_session()
     try:
-        return session.query(Job).filter(Job.id == job_id).first()
+        return session.execute(_SELECT_JOB, {"job_id": job_id}).scalars().first()
     finally:
         close_session()
 
@@ -248,39 +419,99 @@ def update_job(
     completed: Optional[int] = None,
     message: Optional[str] = None,
     url_status: Optional[Dict[str, str]] = None,
-) -> Optional[Job]:
-    """Update job progress."""
-    session = get_session()
-    try:
-        job = session.query(Job).filter(Job.id == job_id).first()
-        if not job:
-            return None
-        if status:
-            job.status = status
-            if status in ("completed", "cancelled", "error"):
-                job.completed_at = datetime.utcnow()
-        if completed is not None:
-            job.completed_urls = completed
-        if message:
-            job.message = message
-        if url_status:
-            job.url_status = url_status
-        session.commit()
-        return job
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        close_session()
+) -> None:
+    """Update job progress (one partial UPDATE of the given fields; no SELECT)."""
+    values: Dict[str, Any] = {}
+    if status:
+        values["status"] = status
+        if status in ("completed", "cancelled", "error"):
+            values["completed_at"] = datetime.utcnow()
+    if completed is not None:
+        values["completed_urls"] = completed
+    if message:
+        values["message"] = message
+    if url_status:
+        values["url_status_json"] = url_status
+    if not values:
+        return
+    stmt = update(Job.__table__).where(Job.__table__.c.id == job_id).values(**values)
+    _run_write(lambda session: session.execute(stmt))
+
+
+# Merges a JSON object of url -> status into url_status inside SQLite, so only
+# the changed entries are sent. URLs are bound as data, never as JSON paths.
+# A NULL :completed leaves completed_urls unchanged.
+_PATCH_URL_STATUS = (
+    update(Job.__table__)
+    .where(Job.__table__.c.id == bindparam("job_id"))
+    .values(
+        url_status_json=func.json_patch(
+            func.ifnull(Job.__table__.c.url_status_json, "{}"), func.json(bindparam("patch"))
+        ),
+        completed_urls=func.coalesce(bindparam("completed", type_=Integer), Job.__table__.c.completed_urls),
+    )
+)
 
 
-def get_recent_jobs(limit: int = 50) -> List[Job]:
-    """Get recent jobs."""
-    session = get_session()
-    try:
-        return session.query(Job).order_by(Job.created_at.desc()).limit(limit).all()
-    finally:
-        close_session()
+def set_url_statuses(job_id: str, statuses: Dict[str, str], completed: Optional[int] = None) -> Future:
+    """
+    Merge url -> status entries into a job's url_status (and set completed_urls,
+    if given) without waiting for the write; the returned Future completes once
+    it is committed.
+    """
+    if engine.dialect.name == "sqlite":
+        params = {"job_id": job_id, "patch": _dumps(statuses), "completed": completed}
+        return _submit_write(lambda session: session.execute(_PATCH_URL_STATUS, params))
+
+    def op(session):
+        job = session.execute(_SELECT_JOB.with_for_update(), {"job_id": job_id}).scalars().first()
+        if job is not None:
+            job.url_status = {**(job.url_status or {}), **statuses}
+            if completed is not None:
+                job.completed_urls = completed
+
+    return _submit_write(op)
+
+
+def set_url_status(job_id: str, url: str, status: str) -> None:
+    """Set one URL's entry in a job's url_status."""
+    set_url_statuses(job_id, {url: status}).result()
+
+
+# Scalar columns needed to list jobs (the urls/url_status blobs are never fetched).
+_JOB_SUMMARY_COLUMNS = (
+    Job.id,
+    Job.status,
+    Job.total_urls,
+    Job.completed_urls,
+    Job.message,
+    Job.created_at,
+    Job.updated_at,
+    Job.completed_at,
+)
+
+
+def get_recent_jobs(limit: int = 50) -> List[Any]:
+    """
+    Get recent jobs as lightweight rows with the Job scalar attributes
+    (id, status, total_urls, completed_urls, message, *_at).
+    """
+    with read_conn() as conn:
+        return conn.execute(select(*_JOB_SUMMARY_COLUMNS).order_by(Job.created_at.desc()).limit(limit)).all()
+
+
+def job_summary_dict(job: Any) -> Dict[str, Any]:
+    """Job.to_dict() without urls/url_status; accepts a Job or a get_recent_jobs() row."""
+    return {
+        "id": job.id,
+        "status": job.status,
+        "total": job.total_urls,
+        "completed": job.completed_urls,
+        "message": job.message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
 
 
 # -----------------------------------------------------------------------------
@@ -288,56 +519,91 @@ def get_recent_jobs(limit: int = 50) -> List[Job]:
 # -----------------------------------------------------------------------------
 
 
-def save_scraped_item(job_id: str, item_data: Dict[str, Any]) -> ScrapedItem:
-    """Save or update a scraped item."""
-    session = get_session()
-    try:
-        website = item_data.get("website", "")
-        # Check if item exists
-        item = session.query(ScrapedItem).filter(
-            ScrapedItem.job_id == job_id,
-            ScrapedItem.website == website
-        ).first()
-
-        if item:
-            # Update existing
-            item.emails = item_data.get("emails", [])
-            item.phones = item_data.get("phones", [])
-            item.profiles = item_data.get("lawyer_profiles", [])
-            item.vcard_data = item_data.get("vcard_data", {})
-            item.pages_visited = item_data.get("pages_visited", 0)
-            item.profiles_found = item_data.get("profiles_found", 0)
-        else:
-            # Create new
-            item = ScrapedItem(
-                job_id=job_id,
-                website=website,
+def _item_row(job_id: str, item_data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Column values (keyed by table column name) for one scraped item, ready for an upsert."""
+    return {
+        "job_id": job_id,
+        "website": item_data.get("website", ""),
+        "emails_json": item_data.get("emails", []),
+        "phones_json": item_data.get("phones", []),
+        "profiles_json": item_data.get("lawyer_profiles", []),
+        "vcard_data_json": item_data.get("vcard_data", {}),
+        "pages_visited": item_data.get("pages_visited", 0),
+        "profiles_found": item_data.get("profiles_found", 0),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _scraped_item_upsert():
+    """INSERT ... ON CONFLICT (job_id, website) DO UPDATE for scraped items."""
+    stmt = _upsert_insert(ScrapedItem.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=["job_id", "website"],
+        set_={
+            name: stmt.excluded[name]
+            for name in (
+                "emails_json",
+                "phones_json",
+                "profiles_json",
+                "vcard_data_json",
+                "pages_visited",
+                "profiles_found",
+                "updated_at",
             )
-            item.emails = item_data.get("emails", [])
-            item.phones = item_data.get("phones", [])
-            item.profiles = item_data.get("lawyer_profiles", [])
-            item.vcard_data = item_data.get("vcard_data", {})
-            item.pages_visited = item_data.get("pages_visited", 0)
-            item.profiles_found = item_data.get("profiles_found", 0)
-            session.add(item)
+        },
+    )
 
-        session.commit()
-        return item
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        close_session()
+
+def save_scraped_item(job_id: str, item_data: Dict[str, Any]) -> None:
+    """Save or update a scraped item (single upsert statement)."""
+    row = _item_row(job_id, item_data, datetime.utcnow())
+    _run_write(lambda session: session.execute(_scraped_item_upsert(), row))
+
+
+def save_scraped_items_bulk(job_id: str, items: List[Dict[str, Any]]) -> int:
+    """
+    Save or update many scraped items for a job in one transaction, as a single
+    executemany upsert. Returns the number of rows written.
+    """
+    if not items:
+        return 0
+    now = datetime.utcnow()
+    # Last item wins if a website appears twice.
+    rows = {row["website"]: row for row in (_item_row(job_id, item, now) for item in items)}
+
+    _run_write(lambda session: session.execute(_scraped_item_upsert(), list(rows.values())))
+    return len(rows)
+
+
+_SELECT_JOB_ITEMS = select(
+    ScrapedItem.website,
+    ScrapedItem.emails,
+    ScrapedItem.phones,
+    ScrapedItem.profiles,
+    ScrapedItem.vcard_data,
+    ScrapedItem.pages_visited,
+    ScrapedItem.profiles_found,
+).where(ScrapedItem.job_id == bindparam("job_id"))
 
 
 def get_job_items(job_id: str) -> List[Dict[str, Any]]:
     """Get all scraped items for a job."""
-    session = get_session()
-    try:
-        items = session.query(ScrapedItem).filter(ScrapedItem.job_id == job_id).all()
-        return [item.to_dict() for item in items]
-    finally:
-        close_session()
+    with read_conn() as conn:
+        # Plain column select: no ORM objects are built for the rows (keys are column names).
+        rows = conn.execute(_SELECT_JOB_ITEMS, {"job_id": job_id}).all()
+    return [
+        {
+            "website": row.website,
+            "emails": row.emails_json or [],
+            "phones": row.phones_json or [],
+            "lawyer_profiles": row.profiles_json or [],
+            "vcard_data": row.vcard_data_json or {},
+            "pages_visited": row.pages_visited,
+            "profiles_found": row.profiles_found,
+        }
+        for row in rows
+    ]
 
 
 # -----------------------------------------------------------------------------
@@ -347,9 +613,23 @@ def get_job_items(job_id: str) -> List[Dict[str, Any]]:
 
 def make_cache_key(practice_area: str, location: str, country: str, page: int) -> str:
     """Generate a cache key for search results."""
-    import hashlib
     key_str = f"{practice_area}|{location}|{country}|{page}"
-    return hashlib.sha256(key_str.encode()).hexdigest()[:64]
+    return hashlib.blake2b(key_str.encode(), digest_size=16).hexdigest()
+
+
+def make_query_cache_key(query: str, start_index: int) -> str:
+    """
+    Generate a cache key from the final search query and result offset.
+    The query is case-folded and whitespace-collapsed so equivalent searches share an entry.
+    """
+    canonical = " ".join(query.lower().split())
+    return hashlib.blake2b(f"{canonical}|{start_index}".encode(), digest_size=16).hexdigest()
+
+
+_SELECT_CACHED_SEARCH = select(SearchCache.results, SearchCache.total_results).where(
+    SearchCache.cache_key == bindparam("cache_key"),
+    SearchCache.expires_at > bindparam("now"),
+)
 
 
 def get_cached_search(
@@ -357,25 +637,19 @@ def get_cached_search(
     location: str,
     country: str,
     page: int,
+    cache_key: Optional[str] = None,
 ) -> Optional[Dict[str, Any]]:
-    """Get cached search results if not expired."""
-    session = get_session()
-    try:
-        cache_key = make_cache_key(practice_area, location, country, page)
-        cache = session.query(SearchCache).filter(SearchCache.cache_key == cache_key).first()
-        if cache and not cache.is_expired:
-            return {
-                "results": cache.results,
-                "total_results": cache.total_results,
-                "cached": True,
-            }
-        # Delete expired cache
-        if cache and cache.is_expired:
-            session.delete(cache)
-            session.commit()
+    """Get cached search results if not expired (expired rows are purged by clear_expired_cache)."""
+    cache_key = cache_key or make_cache_key(practice_area, location, country, page)
+    with read_conn() as conn:
+        row = conn.execute(_SELECT_CACHED_SEARCH, {"cache_key": cache_key, "now": datetime.utcnow()}).first()
+    if row is None:
         return None
-    finally:
-        close_session()
+    return {
+        "results": row.results_json or [],
+        "total_results": row.total_results,
+        "cached": True,
+    }
 
 
 def save_search_cache(
@@ -386,46 +660,72 @@ def save_search_cache(
     results: List[str],
     total_results: int,
     ttl_hours: int = 24,
-) -> SearchCache:
-    """Save search results to cache."""
-    session = get_session()
-    try:
-        cache_key = make_cache_key(practice_area, location, country, page)
-        # Delete existing if any
-        session.query(SearchCache).filter(SearchCache.cache_key == cache_key).delete()
-
-        cache = SearchCache(
-            cache_key=cache_key,
-            query=f"{practice_area} {location} {country}".strip(),
-            practice_area=practice_area,
-            location=location,
-            country=country,
-            page=page,
-            total_results=total_results,
-            expires_at=datetime.utcnow() + timedelta(hours=ttl_hours),
-        )
-        cache.results = results
-        session.add(cache)
-        session.commit()
-        return cache
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        close_session()
-
-
-def clear_expired_cache():
-    """Remove all expired cache entries."""
-    session = get_session()
+    cache_key: Optional[str] = None,
+    query: Optional[str] = None,
+) -> None:
+    """Save search results to cache (single INSERT ... ON CONFLICT DO UPDATE)."""
+    now = datetime.utcnow()
+    values = {
+        "cache_key": cache_key or make_cache_key(practice_area, location, country, page),
+        "query": query or f"{practice_area} {location} {country}".strip(),
+        "practice_area": practice_area,
+        "location": location,
+        "country": country,
+        "page": page,
+        "results_json": results,
+        "total_results": total_results,
+        "created_at": now,
+        "expires_at": now + timedelta(hours=ttl_hours),
+    }
+    stmt = _upsert_insert(SearchCache.__table__).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SearchCache.cache_key],
+        set_={k: stmt.excluded[k] for k in values if k != "cache_key"},
+    )
+    _run_write(lambda session: session.execute(stmt))
+
+
+def clear_expired_cache() -> int:
+    """
+    Remove all expired cache entries in one DELETE (index range scan on
+    expires_at) on the writer. Returns the number of rows removed.
+    """
+    stmt = delete(SearchCache).where(SearchCache.expires_at < datetime.utcnow())
     try:
-        session.query(SearchCache).filter(SearchCache.expires_at < datetime.utcnow()).delete()
-        session.commit()
+        removed = _run_write(lambda session: session.execute(stmt).rowcount)
     except Exception:
-        session.rollback()
-    finally:
-        close_session()
-
+        return 0
+    if removed:
+        try:
+            maybe_vacuum()
+        except Exception:
+            pass
+    return removed
+
+
+def maybe_vacuum(threshold: float = 0.10) -> bool:
+    """
+    Reclaim free pages when more than `threshold` of the SQLite file is unused.
+    Uses PRAGMA incremental_vacuum once the file is in auto_vacuum=INCREMENTAL
+    mode; otherwise runs one full VACUUM, which also switches it to that mode.
+    Returns True if anything was done. No-op for other databases.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+
+    # VACUUM can't run in a transaction, so this runs on the writer as an
+    # autocommit op, between batches.
+    def op(conn):
+        free_pages = conn.exec_driver_sql("PRAGMA freelist_count").scalar() or 0
+        total_pages = conn.exec_driver_sql("PRAGMA page_count").scalar() or 0
+        if not total_pages or free_pages / total_pages <= threshold:
+            return False
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:  # INCREMENTAL
+            # executescript() steps the pragma to completion; a plain execute()
+            # in the sqlite3 module steps once and frees a single page.
+            conn.connection.driver_connection.executescript("PRAGMA incremental_vacuum;")
+        else:
+            conn.exec_driver_sql("VACUUM")
+        return True
 
-# Initialize database on import
-init_db()
+    return _run_write(op, autocommit=True)
@@ -6,9 +6,12 @@ It uses SQLite for persistence and optionally dispatches to Celery for backgroun
 Falls back to in-memory threading if Redis/Celery is not available.
 """
 
+import importlib.util
 import logging
+import threading
+import time
 import uuid
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from database import (
     create_job,
@@ -16,6 +19,7 @@ from database import (
     update_job,
     get_job_items,
     save_scraped_item,
+    save_scraped_items_bulk,
     get_cached_search,
     save_search_cache,
     Job,
@@ -23,31 +27,50 @@ from database import (
 
 logger = logging.getLogger(__name__)
 
-# Check if Celery is available
+# Check if Celery is available. Importing celery_config pulls in celery/kombu,
+# so skip the probe entirely when they are not installed.
+_CELERY_IMPORTABLE = (
+    importlib.util.find_spec("celery") is not None
+    and importlib.util.find_spec("celery_config") is not None
+)
+# A failed probe (e.g. Redis down) is retried after this many seconds.
+_CELERY_RETRY_SECONDS = 60.0
+
 _celery_available: Optional[bool] = None
+_celery_negative_expires_at = 0.0
+_celery_probe_lock = threading.Lock()
 
 
 def is_celery_available() -> bool:
     """Check if Celery/Redis is available and working."""
-    global _celery_available
-    if _celery_available is not None:
+    global _celery_available, _celery_negative_expires_at
+    if not _CELERY_IMPORTABLE:
+        return False
+    if _celery_available or (_celery_available is False and time.monotonic() < _celery_negative_expires_at):
         return _celery_available
 
-    try:
-        from celery_config import is_celery_available as check_celery
-        _celery_available = check_celery()
-    except Exception:
-        _celery_available = False
+    with _celery_probe_lock:
+        # Another thread may have probed while we waited.
+        if _celery_available or (_celery_available is False and time.monotonic() < _celery_negative_expires_at):
+            return _celery_available
+        try:
+            from celery_config import is_celery_available as check_celery
+            _celery_available = check_celery()
+        except Exception:
+            _celery_available = False
+        if not _celery_available:
+            _celery_negative_expires_at = time.monotonic() + _CELERY_RETRY_SECONDS
 
     return _celery_available
 
 
-def start_job(urls: List[str]) -> str:
+def start_job(urls: List[str], settings_overrides: Dict[str, Any] | None = None) -> str:
     """
     Start a new scraping job.
     
     If Celery is available, dispatches to background worker.
     Otherwise, uses the existing in-memory threading approach.
+    settings_overrides are Scrapy settings for this job only, on either path.
     
     Returns the job_id.
     """
@@ -61,43 +84,36 @@ def start_job(urls: List[str]) -> str:
         logger.info(f"Starting job {job_id} via Celery")
         try:
             from celery_tasks import scrape_websites_task
-            scrape_websites_task.delay(job_id, urls)
+            scrape_websites_task.delay(job_id, urls, settings_overrides)
         except Exception as e:
             logger.error(f"Failed to dispatch to Celery: {e}")
             # Fall back to in-memory
-            _start_job_inmemory(job_id, urls)
+            _start_job_inmemory(job_id, urls, settings_overrides)
     else:
         # Use existing in-memory approach
         logger.info(f"Starting job {job_id} in-memory (Celery not available)")
-        _start_job_inmemory(job_id, urls)
+        _start_job_inmemory(job_id, urls, settings_overrides)
 
     return job_id
 
 
-def _start_job_inmemory(job_id: str, urls: List[str]) -> None:
+def _start_job_inmemory(job_id: str, urls: List[str], settings_overrides: Dict[str, Any] | None = None) -> None:
     """Start job using the existing in-memory scrapy_scraper module."""
     import threading
     from twisted.internet import reactor
     
     from scrapy_scraper import (
-        _ensure_job_structures,
+        _start_job_state,
+        _create_job_crawler,
         _ensure_reactor_running,
         _get_runner,
         _crawl_serial_lock,
-        scraping_progress_by_job,
-        progress_lock,
-        scraped_items_by_job,
-        items_lock,
-        _job_cancelled,
-        _job_crawlers,
-        _job_control_lock,
         update_progress,
         get_scraped_items,
         is_job_cancelled,
         _latest_job_id,
         _latest_job_id_lock,
     )
-    from spiders.website_spider import WebsiteSpider
     
     # Set as latest job
     import scrapy_scraper
@@ -105,23 +121,7 @@ def _start_job_inmemory(job_id: str, urls: List[str]) -> None:
         scrapy_scraper._latest_job_id = job_id
     
     # Initialize structures
-    _ensure_job_structures(job_id)
-    with items_lock:
-        scraped_items_by_job[job_id] = []
-    with _job_control_lock:
-        _job_cancelled[job_id] = False
-    
-    with progress_lock:
-        scraping_progress_by_job[job_id] = {
-            'job_id': job_id,
-            'status': 'running',
-            'total': len(urls),
-            'completed': 0,
-            'current_url': '',
-            'urls': urls,
-            'url_status': {url: 'pending' for url in urls},
-            'message': f'Starting to scrape {len(urls)} website(s)...',
-        }
+    state = _start_job_state(job_id, urls)
     
     # Update database
     update_job(job_id, status="running", message="Starting scrape...")
@@ -139,9 +139,9 @@ def _start_job_inmemory(job_id: str, urls: List[str]) -> None:
             
             def _start_in_reactor():
                 try:
-                    crawler = runner.create_crawler(WebsiteSpider)
-                    with _job_control_lock:
-                        _job_crawlers[job_id] = crawler
+                    crawler = _create_job_crawler(runner, settings_overrides)
+                    with state.lock:
+                        state.crawler = crawler
                     deferred = runner.crawl(crawler, urls=urls, job_id=job_id)
                 except Exception as e:
                     update_progress(job_id=job_id, status="error", message=f"Error: {e}")
@@ -153,10 +153,9 @@ def _start_job_inmemory(job_id: str, urls: List[str]) -> None:
                     update_progress(job_id=job_id, status="completed", message=f"Completed! Found {len(items)} site(s).")
                     update_job(job_id, status="completed", message=f"Completed! Found {len(items)} site(s).")
                     # Sync to database
-                    for item in items:
-                        save_scraped_item(job_id, item)
-                    with _job_control_lock:
-                        _job_crawlers.pop(job_id, None)
+                    save_scraped_items_bulk(job_id, items)
+                    with state.lock:
+                        state.crawler = None
                 
                 def on_error(failure):
                     msg = str(failure.value) if hasattr(failure, 'value') else str(failure)
@@ -166,8 +165,8 @@ def _start_job_inmemory(job_id: str, urls: List[str]) -> None:
                     else:
                         update_progress(job_id=job_id, status="error", message=msg)
                         update_job(job_id, status="error", message=msg)
-                    with _job_control_lock:
-                        _job_crawlers.pop(job_id, None)
+                    with state.lock:
+                        state.crawler = None
                 
                 deferred.addCallback(on_complete)
                 deferred.addErrback(on_error)
@@ -215,6 +214,55 @@ def get_job_progress(job_id: str) -> Dict[str, Any]:
         }
 
 
+def get_any_progress(job_id: str) -> Dict[str, Any]:
+    """
+    Get job progress from whichever source has it, in one call.
+    Checks the in-memory tracker first (no I/O) and only falls back to SQLite
+    for jobs not known to this process (e.g. after a restart).
+    """
+    import scrapy_scraper
+
+    state = scrapy_scraper._get_job_state(job_id)
+    if state is not None:
+        with state.lock:
+            # Read paths create empty placeholders for unknown ids; skip those so
+            # jobs run by a Celery worker are still answered from the database.
+            if state.progress.urls:
+                return state.progress.to_dict()
+
+    try:
+        job = get_job(job_id)
+    except Exception:
+        job = None
+    if job:
+        return job.to_dict()
+
+    return scrapy_scraper.get_scraping_progress(job_id)
+
+
+def get_any_job_data(job_id: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Get (urls, scraped items) for a job. Jobs started in this process are read
+    from memory (live results while running); anything else, such as jobs run
+    by a Celery worker, is read from the database.
+    """
+    import scrapy_scraper
+
+    state = scrapy_scraper._get_job_state(job_id)
+    urls = scrapy_scraper.get_job_urls(job_id) if state is not None else []
+    if urls:
+        return urls, scrapy_scraper.get_scraped_items(job_id)
+
+    try:
+        job = get_job(job_id)
+    except Exception:
+        job = None
+    if job:
+        return job.urls, get_job_items(job_id)
+
+    return [], []
+
+
 def get_job_results(job_id: str) -> List[Dict[str, Any]]:
     """Get scraped items for a job."""
     # Try database first
@@ -235,9 +283,10 @@ def get_cached_results(
     location: str,
     country: str,
     page: int,
+    cache_key: Optional[str] = None,
 ) -> Optional[Dict[str, Any]]:
     """Get cached search results."""
-    return get_cached_search(practice_area, location, country, page)
+    return get_cached_search(practice_area, location, country, page, cache_key=cache_key)
 
 
 def cache_results(
@@ -248,6 +297,18 @@ def cache_results(
     results: List[str],
     total_results: int,
     ttl_hours: int = 24,
+    cache_key: Optional[str] = None,
+    query: Optional[str] = None,
 ) -> None:
     """Cache search results."""
-    save_search_cache(practice_area, location, country, page, results, total_results, ttl_hours)
+    save_search_cache(
+        practice_area,
+        location,
+        country,
+        page,
+        results,
+        total_results,
+        ttl_hours,
+        cache_key=cache_key,
+        query=query,
+    )
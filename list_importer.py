@@ -2,23 +2,83 @@
 Module for importing URLs from external lists (WSJ, SuperLawyers, etc.)
 """
 import re
-from typing import List, Tuple
-from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from typing import Iterable, Iterator, List, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, UnicodeDammit
+from requests.adapters import HTTPAdapter
+
+# Parse list pages straight into a libxml2 tree when lxml is installed (it ships
+# with Scrapy); BeautifulSoup + html.parser otherwise.
+try:
+    import lxml.html
+    _UTF8_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Use the C++ WHATWG parser when installed; fall back to urllib otherwise.
+try:
+    from ada_url import URL as AdaURL
+    ADA_AVAILABLE = True
+except ImportError:
+    ADA_AVAILABLE = False
 
 
 _DROP_QUERY_KEYS_PREFIX = ("utm_",)
-_DROP_QUERY_KEYS_EXACT = {
+_DROP_QUERY_KEYS_EXACT = frozenset({
     "gclid",
     "fbclid",
     "msclkid",
     "igshid",
     "mc_cid",
     "mc_eid",
-}
+})
+
+# A query key normalize_url() would drop, found without parsing the query.
+_TRACKING_KEY_RE = re.compile(
+    r"(?:^|&)(?:"
+    + "|".join(re.escape(p) for p in _DROP_QUERY_KEYS_PREFIX)
+    + "|"
+    + "|".join(re.escape(k) + r"(?=[=&]|$)" for k in sorted(_DROP_QUERY_KEYS_EXACT))
+    + ")",
+    re.IGNORECASE,
+)
 
+# URLs already in the exact shape normalize_url() produces (lowercase scheme and
+# host without "www." or port, explicit path without trailing slash or dot
+# segments, no query/fragment/params) are returned unchanged without a
+# parse-and-rebuild round trip. The path character set is restricted to what
+# both urllib and ada leave untouched.
+_CANONICAL_URL_RE = re.compile(
+    r"https?://(?!www\.)(?:[a-z0-9-]+\.)*[a-z][a-z0-9-]*"
+    r"(?!.*/(?:\.|%2[eE]))/(?:[!$%&'()*+\-./0-9:=@A-Z\[\]_a-z|~]*[!$%&'()*+\-0-9=@A-Z\[\]_a-z|~])?"
+)
 
+
+def _split_url(url: str) -> Tuple[str, str, str, str] | None:
+    """Split an absolute URL into (scheme, netloc, path, query); None if unparseable."""
+    if ADA_AVAILABLE:
+        try:
+            parsed = AdaURL(url)
+        except ValueError:
+            return None
+        return parsed.protocol[:-1], parsed.host, parsed.pathname, parsed.search[1:]
+
+    try:
+        parsed = urlsplit(url)
+    except ValueError:  # e.g. a malformed IPv6 literal
+        return None
+    # The caller guarantees an http(s) scheme, and urlsplit lowercases it.
+    return parsed.scheme, parsed.netloc.lower(), parsed.path, parsed.query
+
+
+# List pages repeat the same hrefs many times, and text URLs are normalized
+# again when filtered; memoize the pure str -> str mapping.
+@lru_cache(maxsize=4096)
 def normalize_url(url: str) -> str | None:
     """
     Normalize a URL for deduping:
@@ -32,22 +92,21 @@ def normalize_url(url: str) -> str | None:
     url = url.strip().rstrip('.,;:')
     if not url:
         return None
+    if _CANONICAL_URL_RE.fullmatch(url):
+        return url
 
-    # If it's a bare domain, add scheme.
-    if not url.startswith(("http://", "https://")):
+    # If it's a bare domain, add scheme (schemes are case-insensitive: "HTTP://").
+    if not url[:8].lower().startswith(("http://", "https://")):
         url = f"https://{url}"
 
-    try:
-        parsed = urlparse(url)
-    except Exception:
+    parts = _split_url(url)
+    if parts is None:
         return None
+    scheme, netloc, path, query = parts
 
-    if not parsed.netloc:
+    if not netloc:
         return None
 
-    scheme = (parsed.scheme or "https").lower()
-    netloc = parsed.netloc.lower()
-
     # Normalize www.
     if netloc.startswith("www."):
         netloc = netloc[4:]
@@ -55,27 +114,44 @@ def normalize_url(url: str) -> str | None:
     # Drop fragment.
     fragment = ""
 
-    # Filter query params.
-    query_pairs = parse_qsl(parsed.query, keep_blank_values=True)
-    filtered_pairs = []
-    for k, v in query_pairs:
-        kl = k.lower()
-        if any(kl.startswith(pfx) for pfx in _DROP_QUERY_KEYS_PREFIX):
-            continue
-        if kl in _DROP_QUERY_KEYS_EXACT:
-            continue
-        filtered_pairs.append((k, v))
-    query = urlencode(filtered_pairs, doseq=True)
+    # Filter query params (only parsed when a tracking key is present; other
+    # queries are kept verbatim).
+    if query and _TRACKING_KEY_RE.search(query):
+        query_pairs = parse_qsl(query, keep_blank_values=True)
+        filtered_pairs = []
+        for k, v in query_pairs:
+            kl = k.lower()
+            if kl.startswith(_DROP_QUERY_KEYS_PREFIX):
+                continue
+            if kl in _DROP_QUERY_KEYS_EXACT:
+                continue
+            filtered_pairs.append((k, v))
+        query = urlencode(filtered_pairs, doseq=True)
 
     # Normalize path: keep it, but collapse trailing slash.
-    path = parsed.path or "/"
+    path = path or "/"
     if path != "/" and path.endswith("/"):
         path = path[:-1]
 
-    normalized = urlunparse((scheme, netloc, path, "", query, fragment))
+    normalized = urlunsplit((scheme, netloc, path, query, fragment))
     return normalized
 
 
+_REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Shared pooled session: repeated imports (and the parallel fetches in
+# search_from_lists) reuse TCP/TLS connections.
+_LIST_FETCH_WORKERS = 8
+_SESSION = requests.Session()
+_SESSION.headers.update(_REQUEST_HEADERS)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=_LIST_FETCH_WORKERS))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=_LIST_FETCH_WORKERS))
+
+# Bytes of an imported list page that are read and parsed; the rest is dropped.
+_MAX_LIST_PAGE_BYTES = 5_000_000
+
 _SKIP_NETLOCS = {
     "facebook.com",
     "twitter.com",
@@ -89,26 +165,27 @@ _SKIP_NETLOCS = {
 }
 
 
-def _is_candidate_site(url: str, *, source_netloc: str | None = None) -> bool:
-    """Heuristic filter to keep likely external firm sites."""
-    try:
-        parsed = urlparse(url)
-    except Exception:
-        return False
+def _dedup(items: Iterable[str]) -> List[str]:
+    """Drop duplicates, keeping first-seen order."""
+    return list(dict.fromkeys(items))
+
 
-    host = (parsed.netloc or "").lower()
-    if host.startswith("www."):
-        host = host[4:]
+def _strip_www(netloc: str) -> str:
+    netloc = netloc.lower()
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+def _is_candidate_host(host: str, *, source_host: str | None = None) -> bool:
+    """
+    Heuristic filter to keep likely external firm sites.
+    Hosts are compared in normalize_url() form (lowercase, no "www.").
+    """
     if not host or "." not in host:
         return False
 
     # Skip same-site links when importing from an article/list page.
-    if source_netloc:
-        sn = source_netloc.lower()
-        if sn.startswith("www."):
-            sn = sn[4:]
-        if host == sn:
-            return False
+    if source_host and host == source_host:
+        return False
 
     # Skip obvious non-targets (social/logins).
     if host in _SKIP_NETLOCS:
@@ -117,38 +194,59 @@ def _is_candidate_site(url: str, *, source_netloc: str | None = None) -> bool:
     return True
 
 
+# Absolute http(s) URLs in free text. One character class (no overlapping
+# alternatives) so matching stays linear on long runs of URL-ish characters.
+_URL_RE = re.compile(r"https?://[A-Za-z0-9!$%&'()*+,\-./:;<=>?@\[\\\]^_]+")
+# Bare domain names ("example.com", "www.example.co.uk"). Matches start only at a
+# label boundary and need an alphabetic TLD, so version numbers ("3.11.7") are
+# skipped and a failed attempt is not retried from every following character.
+_DOMAIN_RE = re.compile(
+    r'(?<![A-Za-z0-9.-])(?:[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?\.)+[A-Za-z]{2,63}(?![A-Za-z0-9-])'
+)
+# Both of the above in one alternation, so the text is scanned once.
+_URL_OR_DOMAIN_RE = re.compile(f"(?P<url>{_URL_RE.pattern})|(?P<domain>{_DOMAIN_RE.pattern})")
+
+
+def _iter_text_candidates(text: str) -> Iterator[str]:
+    """Yield raw URL/domain candidates found in text, in order (not normalized)."""
+    # One pass over the text for both full URLs and bare domains (don’t require
+    # law keywords; many firms don't include them).
+    for match in _URL_OR_DOMAIN_RE.finditer(text):
+        url = match.group('url')
+        if url is None:
+            yield match.group('domain')
+            continue
+        yield url
+        # A URL's host also counts as a bare-domain candidate (its site root).
+        host = _DOMAIN_RE.match(url, url.index('//') + 2)
+        if host:
+            yield host.group()
+
+
 def extract_urls_from_text(text: str) -> List[str]:
     """
     Extract URLs from plain text using regex.
     Returns a list of unique URLs found in the text.
     """
-    # Pattern to match URLs
-    url_pattern = re.compile(
-        r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-    )
-    urls = url_pattern.findall(text)
-    
-    # Also look for domain-like patterns
-    domain_pattern = re.compile(
-        r'(?:www\.)?[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)+'
-    )
-    domains = domain_pattern.findall(text)
-    
-    # Add any domain-like matches (don’t require law keywords; many firms don't include them).
-    for domain in domains:
-        if not domain.startswith('http'):
-            urls.append(domain)
-    
-    # Remove duplicates and normalize
-    unique_urls = []
-    seen = set()
-    for url in urls:
-        normalized = normalize_url(url)
-        if normalized and normalized not in seen:
-            seen.add(normalized)
-            unique_urls.append(normalized)
-    
-    return unique_urls
+    # Normalize and remove duplicates
+    return _dedup(filter(None, map(normalize_url, _iter_text_candidates(text))))
+
+
+def _page_links_and_text(body: bytes) -> Tuple[List[str], str]:
+    """Return the <a href> values and the visible text of an HTML page."""
+    if not body.strip():
+        return [], ""
+    if LXML_AVAILABLE:
+        # One C-level parse and two XPath queries; no BeautifulSoup tree is built.
+        # UnicodeDammit decodes the page (BOM, <meta charset>, detection) as
+        # BeautifulSoup would; libxml2 would assume Latin-1 for undeclared bytes.
+        markup = UnicodeDammit(body, is_html=True).unicode_markup or ""
+        doc = lxml.html.fromstring(markup.encode("utf-8"), parser=_UTF8_HTML_PARSER)
+        text = " ".join(doc.xpath("//text()[not(ancestor::script or ancestor::style)]"))
+        return doc.xpath("//a/@href"), text
+
+    soup = BeautifulSoup(body, "html.parser")
+    return [link["href"] for link in soup.find_all("a", href=True)], soup.get_text(" ", strip=True)
 
 
 def extract_urls_from_url(article_url: str) -> List[str]:
@@ -163,41 +261,31 @@ def extract_urls_from_url(article_url: str) -> List[str]:
         List of URLs that appear to be law firm websites
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(article_url, headers=headers, timeout=30)
-        response.raise_for_status()
+        with _SESSION.get(article_url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            # Read at most _MAX_LIST_PAGE_BYTES so huge pages can't blow up parse time.
+            body = response.raw.read(_MAX_LIST_PAGE_BYTES, decode_content=True)
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        source_netloc = urlparse(article_url).netloc
+        hrefs, text = _page_links_and_text(body)
+        source_host = _strip_www(urlsplit(article_url).netloc)
         
-        # Extract all href attributes
-        urls = []
-        for link in soup.find_all('a', href=True):
-            href = link.get('href')
-            if href:
-                full_url = urljoin(article_url, href)
-                urls.append(full_url)
+        # Extract all href attributes. A "[" before the query can only be an
+        # IPv6 literal, which urljoin() rejects by raising; screening for it
+        # keeps one malformed link from aborting the whole page.
+        urls = (urljoin(article_url, href) for href in hrefs if href and "[" not in href.partition("?")[0])
         
-        # Also extract URLs from text content
-        text_urls = extract_urls_from_text(response.text)
-        urls.extend(text_urls)
+        # Also extract URLs mentioned in the visible text (hrefs are covered
+        # above; scripts/styles/attributes would only feed the regex noise).
+        urls = chain(urls, _iter_text_candidates(text))
         
-        # Normalize + filter to likely external target websites
-        filtered_urls = []
-        seen = set()
-        for url in urls:
-            normalized = normalize_url(url)
-            if not normalized:
-                continue
-            if not _is_candidate_site(normalized, source_netloc=source_netloc):
-                continue
-            if normalized not in seen:
-                seen.add(normalized)
-                filtered_urls.append(normalized)
-
-        return filtered_urls
+        # Normalize + filter to likely external target websites, streaming the
+        # candidates straight into the dedup without intermediate lists.
+        # normalize_url() output is always "scheme://host/...": no re-parse needed.
+        return _dedup(
+            normalized
+            for normalized in map(normalize_url, urls)
+            if normalized and _is_candidate_host(normalized.split("/", 3)[2], source_host=source_host)
+        )
         
     except Exception as e:
         print(f"Error extracting URLs from {article_url}: {e}")
@@ -223,11 +311,25 @@ def search_from_list(list_url: str = None, list_text: str = None) -> Tuple[List[
         urls = extract_urls_from_text(list_text)
     
     # Remove duplicates while preserving order
-    unique_urls = []
-    seen = set()
-    for url in urls:
-        if url and url not in seen:
-            seen.add(url)
-            unique_urls.append(url)
+    unique_urls = _dedup(filter(None, urls))
     
     return unique_urls, len(unique_urls)
+
+
+def search_from_lists(list_urls: List[str]) -> Tuple[List[str], int]:
+    """
+    Extract URLs from several article/list pages, fetched concurrently.
+    
+    Args:
+        list_urls: URLs of the article/list pages
+        
+    Returns:
+        Tuple of (list of URLs in list order, count)
+    """
+    list_urls = _dedup(filter(None, list_urls))
+    if not list_urls:
+        return [], 0
+    with ThreadPoolExecutor(max_workers=min(_LIST_FETCH_WORKERS, len(list_urls))) as executor:
+        per_list = list(executor.map(extract_urls_from_url, list_urls))
+    unique_urls = _dedup(url for urls in per_list for url in urls)
+    return unique_urls, len(unique_urls)
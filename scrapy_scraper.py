@@ -2,67 +2,116 @@
 Helper module for running Scrapy spiders from Flask.
 This module provides a synchronous interface to Scrapy's async framework.
 """
+import logging
 import os
 import threading
-import time
 import uuid
-from typing import List, Dict, Any
-
-# Install asyncio reactor BEFORE importing reactor if Playwright is enabled
-# This must happen before any other Twisted imports
-_use_playwright = os.getenv("USE_PLAYWRIGHT", "false").lower() == "true"
-if _use_playwright:
-    try:
-        import asyncio
-        from twisted.internet import asyncioreactor
-        # Only install if not already installed
-        try:
-            asyncioreactor.install(asyncio.new_event_loop())
-        except Exception:
-            pass  # Already installed
-    except ImportError:
-        pass
-
-from scrapy.crawler import CrawlerRunner
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Tuple
+
+# Install the asyncio reactor BEFORE importing reactor, on uvloop when it is
+# available. This must happen before any other Twisted imports
+import asyncio
+from twisted.internet import asyncioreactor
+
+try:
+    import uvloop
+    ASYNCIO_EVENT_LOOP = "uvloop.Loop"
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    ASYNCIO_EVENT_LOOP = None
+    _new_event_loop = asyncio.new_event_loop
+
+# Only install if not already installed
+try:
+    _event_loop = _new_event_loop()
+    asyncioreactor.install(_event_loop)
+    # Current loop too, so a CrawlerProcess later started in this process
+    # (the Celery task) drives the same loop as the installed reactor.
+    asyncio.set_event_loop(_event_loop)
+except Exception:
+    pass  # Already installed
+
+from scrapy.crawler import Crawler, CrawlerRunner
 from scrapy.settings import Settings
 from twisted.internet import reactor
+from twisted.internet.task import LoopingCall
 from spiders.website_spider import WebsiteSpider
 
+# Optional: keep aggregated values ordered as they arrive so closing a spider
+# does not sort every large set at once on the reactor thread
+try:
+    from sortedcontainers import SortedSet
+    SORTEDCONTAINERS_AVAILABLE = True
+except ImportError:
+    SORTEDCONTAINERS_AVAILABLE = False
 
-# Global storage for scraped items (per job)
-scraped_items_by_job: Dict[str, List[Dict[str, Any]]] = {}
-items_lock = threading.Lock()
+logger = logging.getLogger(__name__)
 
-# Live intermediate results (updated during scraping, before spider closes)
-live_results_by_job: Dict[str, Dict[str, Dict[str, Any]]] = {}  # job_id -> { website -> aggregated_data }
-live_results_lock = threading.Lock()
 
-# Global progress tracking (per job)
-scraping_progress_by_job: Dict[str, Dict[str, Any]] = {}
-progress_lock = threading.Lock()
+_LIVE_FLUSH_INTERVAL = 0.25  # seconds between live-result publishes from the pipeline
+
 _latest_job_id_lock = threading.Lock()
 _latest_job_id: str | None = None
 
-# Job cancellation + crawler handles (best-effort stop)
-_job_cancelled: Dict[str, bool] = {}
-_job_crawlers: Dict[str, Any] = {}
-_job_control_lock = threading.Lock()
-
 
 def _new_job_id() -> str:
     return uuid.uuid4().hex
 
 
-def _default_progress_dict() -> Dict[str, Any]:
-    return {
-        'status': 'idle',  # idle, running, completed, error
-        'total': 0,
-        'completed': 0,
-        'current_url': '',
-        'urls': [],
-        'url_status': {},  # url -> status (pending, scraping, completed, error)
-        'message': '',
-    }
+@dataclass(slots=True)
+class ProgressState:
+    """Progress of one job; read it through to_dict()."""
+    status: str = 'idle'  # idle, running, completed, error
+    total: int = 0
+    completed: int = 0
+    current_url: str = ''
+    urls: List[str] = field(default_factory=list)
+    url_status: Dict[str, str] = field(default_factory=dict)  # url -> status (pending, scraping, completed, error)
+    message: str = ''
+    job_id: str | None = None
+    completed_urls: int = 0  # entries in url_status that are 'completed', kept incrementally
+
+    def set_url_status(self, url: str, status: str) -> None:
+        previous = self.url_status.get(url)
+        self.url_status[url] = status
+        if previous != status:
+            if status == 'completed':
+                self.completed_urls += 1
+            elif previous == 'completed':
+                self.completed_urls -= 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            'status': self.status,
+            'total': self.total,
+            'completed': self.completed,
+            'current_url': self.current_url,
+            'urls': self.urls,
+            'url_status': dict(self.url_status),
+            'message': self.message,
+        }
+        if self.job_id:
+            data['job_id'] = self.job_id
+        return data
+
+
+@dataclass
+class JobState:
+    """Everything tracked for one job, guarded by the job's own lock."""
+    lock: threading.RLock = field(default_factory=threading.RLock)
+    progress: ProgressState = field(default_factory=ProgressState)
+    items: List[Dict[str, Any]] = field(default_factory=list)  # final results
+    live: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # website -> latest snapshot while running
+    cancelled: bool = False
+    crawler: Any = None  # running Crawler, for best-effort stop
+
+
+# Per-job state; _jobs_lock only guards the dict itself, so jobs never block each other.
+# Lookups read _jobs without the lock: a single dict.get() is atomic under the GIL
+# and entries are only ever added (or the dict cleared), never swapped in place.
+_jobs: Dict[str, JobState] = {}
+_jobs_lock = threading.Lock()
 
 
 def _resolve_job_id(job_id: str | None) -> str:
@@ -73,23 +122,44 @@ def _resolve_job_id(job_id: str | None) -> str:
         return _latest_job_id or "default"
 
 
-def _ensure_job_structures(job_id: str) -> None:
-    """Create empty progress/items containers for the job if missing."""
-    global scraping_progress_by_job, scraped_items_by_job, live_results_by_job
-    with progress_lock:
-        if job_id not in scraping_progress_by_job:
-            scraping_progress_by_job[job_id] = _default_progress_dict()
-    with items_lock:
-        scraped_items_by_job.setdefault(job_id, [])
-    with live_results_lock:
-        live_results_by_job.setdefault(job_id, {})
-    with _job_control_lock:
-        _job_cancelled.setdefault(job_id, False)
+def _get_job_state(job_id: str) -> JobState | None:
+    """Return the job's state if this process knows the job, without creating it."""
+    return _jobs.get(job_id)
+
+
+def _ensure_job_structures(job_id: str) -> JobState:
+    """Return the job's state, creating empty progress/items containers if missing."""
+    state = _jobs.get(job_id)
+    if state is not None:
+        return state
+    with _jobs_lock:
+        state = _jobs.get(job_id)
+        if state is None:
+            state = _jobs[job_id] = JobState()
+        return state
+
+
+def _start_job_state(job_id: str, urls: List[str]) -> JobState:
+    """Reset a job's results and mark it running over urls."""
+    state = _ensure_job_structures(job_id)
+    with state.lock:
+        state.items = []
+        state.cancelled = False
+        state.progress = ProgressState(
+            job_id=job_id,
+            status='running',
+            total=len(urls),
+            urls=urls,
+            url_status={url: 'pending' for url in urls},
+            message=f'Starting to scrape {len(urls)} website(s)...',
+        )
+    return state
 
 # Twisted reactor can only be started once per process. We keep it running in a
 # background thread and schedule crawls onto it.
 _reactor_thread_lock = threading.Lock()
 _reactor_thread: threading.Thread | None = None
+_reactor_ready = threading.Event()
 
 _runner_lock = threading.Lock()
 _runner: CrawlerRunner | None = None
@@ -97,24 +167,54 @@ _runner: CrawlerRunner | None = None
 # The current Flask app/progress tracking assumes only one crawl at a time.
 _crawl_serial_lock = threading.Lock()
 
+# Wall-clock limit for the blocking scrape_websites_with_scrapy() entrypoint
+_SYNC_CRAWL_TIMEOUT = 300
+
+
+_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+)
+_DEFAULT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en',
+}
+_PLAYWRIGHT_DOWNLOAD_HANDLERS = {
+    "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
+    "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
+}
+
+
+def _autothrottle_target(per_domain: int) -> float:
+    """AutoThrottle target just under the per-domain cap, so it never chases a
+    concurrency the downloader cannot reach."""
+    return max(1.0, per_domain - 0.5)
+
+
+def _with_derived_autothrottle(settings_overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Add a matching AutoThrottle target when overrides raise or lower only the per-domain cap."""
+    if ('CONCURRENT_REQUESTS_PER_DOMAIN' in settings_overrides
+            and 'AUTOTHROTTLE_TARGET_CONCURRENCY' not in settings_overrides):
+        per_domain = int(settings_overrides['CONCURRENT_REQUESTS_PER_DOMAIN'])
+        return {**settings_overrides, 'AUTOTHROTTLE_TARGET_CONCURRENCY': _autothrottle_target(per_domain)}
+    return settings_overrides
+
 
 def _build_scrapy_settings() -> Settings:
     """Configure Scrapy settings (shared across crawls)."""
-    import os
-    
     settings = Settings()
-    settings.set(
-        'USER_AGENT',
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    )
+    settings.set('USER_AGENT', _USER_AGENT)
     settings.set('ROBOTSTXT_OBEY', False)  # Set to False to scrape more aggressively
-    settings.set('DOWNLOAD_DELAY', 0.25)  # Low delay for faster parallel scraping
-    settings.set('CONCURRENT_REQUESTS', 32)  # High concurrency for parallel sites
-    settings.set('CONCURRENT_REQUESTS_PER_DOMAIN', 4)  # Limit per-site to spread across sites
+    # Concurrency ceilings are env-tunable; AutoThrottle still backs off per host,
+    # so no fixed DOWNLOAD_DELAY is needed by default.
+    settings.set('DOWNLOAD_DELAY', float(os.getenv('SCRAPY_DOWNLOAD_DELAY', '0')))
+    settings.set('CONCURRENT_REQUESTS', int(os.getenv('SCRAPY_CONCURRENT_REQUESTS', '32')))
+    per_domain = int(os.getenv('SCRAPY_CONCURRENT_REQUESTS_PER_DOMAIN', '8'))
+    settings.set('CONCURRENT_REQUESTS_PER_DOMAIN', per_domain)
+    settings.set('CONCURRENT_ITEMS', int(os.getenv('SCRAPY_CONCURRENT_ITEMS', '100')))
     settings.set('AUTOTHROTTLE_ENABLED', True)
     settings.set('AUTOTHROTTLE_START_DELAY', 0.25)
     settings.set('AUTOTHROTTLE_MAX_DELAY', 3)
-    settings.set('AUTOTHROTTLE_TARGET_CONCURRENCY', 8.0)  # Target concurrency per domain
+    settings.set('AUTOTHROTTLE_TARGET_CONCURRENCY', _autothrottle_target(per_domain))  # Target concurrency per domain
     settings.set('LOG_LEVEL', 'INFO')  # Show info level logs
 
     # Breadth-first crawling: process all base URLs before following subpages
@@ -122,6 +222,10 @@ def _build_scrapy_settings() -> Settings:
     settings.set('DEPTH_PRIORITY', 1)
     settings.set('SCHEDULER_DISK_QUEUE', 'scrapy.squeues.PickleFifoDiskQueue')
     settings.set('SCHEDULER_MEMORY_QUEUE', 'scrapy.squeues.FifoMemoryQueue')
+    # Pull the next request from the least busy domain so one large site cannot
+    # stall the others (incompatible with CONCURRENT_REQUESTS_PER_IP; keep it unset)
+    settings.set('SCHEDULER_PRIORITY_QUEUE', 'scrapy.pqueues.DownloaderAwarePriorityQueue')
+    settings.set('REACTOR_THREADPOOL_MAXSIZE', 40)  # DNS lookups run on this pool
 
     settings.set(
         'ITEM_PIPELINES',
@@ -130,38 +234,40 @@ def _build_scrapy_settings() -> Settings:
         },
     )
     settings.set('DOWNLOAD_TIMEOUT', 30)
+    # Resolve each host once per process instead of on every fresh connection
+    settings.set('DNS_RESOLVER', 'scrapy.resolver.CachingThreadedResolver')
+    settings.set('DNSCACHE_ENABLED', True)
+    settings.set('DNSCACHE_SIZE', 10000)
+    settings.set('DNS_TIMEOUT', 10)
     settings.set('RETRY_ENABLED', True)
     settings.set('RETRY_TIMES', 2)
     settings.set('REQUEST_FINGERPRINTER_IMPLEMENTATION', '2.7')  # Fix deprecation warning
     settings.set('HTTPERROR_ALLOWED_CODES', [403, 404])  # Allow some error codes
-    settings.set(
-        'DEFAULT_REQUEST_HEADERS',
-        {
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en',
-        },
-    )
+    settings.set('DEFAULT_REQUEST_HEADERS', _DEFAULT_HEADERS)
     
+    # Asyncio reactor everywhere (matches the install at import time)
+    settings.set('TWISTED_REACTOR', 'twisted.internet.asyncioreactor.AsyncioSelectorReactor')
+    if ASYNCIO_EVENT_LOOP:
+        settings.set('ASYNCIO_EVENT_LOOP', ASYNCIO_EVENT_LOOP)
+
     # Playwright settings for JavaScript rendering (if enabled)
     use_playwright = os.getenv("USE_PLAYWRIGHT", "false").lower() == "true"
     if use_playwright:
         try:
             import scrapy_playwright  # noqa: F401
-            settings.set('DOWNLOAD_HANDLERS', {
-                "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-                "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-            })
-            settings.set('TWISTED_REACTOR', 'twisted.internet.asyncioreactor.AsyncioSelectorReactor')
+            settings.set('DOWNLOAD_HANDLERS', _PLAYWRIGHT_DOWNLOAD_HANDLERS)
             settings.set('PLAYWRIGHT_BROWSER_TYPE', 'chromium')
             settings.set('PLAYWRIGHT_LAUNCH_OPTIONS', {
                 'headless': True,
                 'args': ['--no-sandbox', '--disable-dev-shm-usage'],
             })
             settings.set('PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT', 30000)
-            print("✓ Playwright enabled for JavaScript rendering")
+            logger.info("Playwright enabled for JavaScript rendering")
         except ImportError:
-            print("⚠ Playwright not installed, using standard HTTP requests")
+            logger.warning("Playwright not installed, using standard HTTP requests")
     
+    # Built once at import and never modified afterwards
+    settings.freeze()
     return settings
 
 
@@ -183,6 +289,8 @@ def _ensure_reactor_running() -> None:
             # Thread exists but reactor isn't marked running yet; fall through to wait.
             pass
         else:
+            # Queued before the thread starts, so the startup signal cannot be missed
+            reactor.callWhenRunning(_reactor_ready.set)
             _reactor_thread = threading.Thread(
                 target=reactor.run,
                 kwargs={'installSignalHandlers': 0},
@@ -192,9 +300,17 @@ def _ensure_reactor_running() -> None:
             _reactor_thread.start()
 
     # Wait briefly for reactor to start.
-    deadline = time.monotonic() + 2.0
-    while not reactor.running and time.monotonic() < deadline:
-        time.sleep(0.01)
+    _reactor_ready.wait(2.0)
+
+
+def _create_job_crawler(runner: CrawlerRunner, settings_overrides: Dict[str, Any] | None = None) -> Crawler:
+    """Create the crawler for one job, applying any per-job settings on top of the shared ones."""
+    if not settings_overrides:
+        return runner.create_crawler(WebsiteSpider)
+
+    settings = Settings(_SCRAPY_SETTINGS)
+    settings.setdict(_with_derived_autothrottle(settings_overrides), priority='cmdline')
+    return runner.create_crawler(Crawler(WebsiteSpider, settings))
 
 
 def _get_runner() -> CrawlerRunner:
@@ -202,15 +318,43 @@ def _get_runner() -> CrawlerRunner:
     global _runner
     with _runner_lock:
         if _runner is None:
-            _runner = CrawlerRunner(_SCRAPY_SETTINGS)
+            # Crawlers layer spider settings onto the runner's copy, so hand it a
+            # mutable one and keep the shared base frozen
+            _runner = CrawlerRunner(Settings(_SCRAPY_SETTINGS))
         return _runner
 
 
+# Per-site cap on each aggregated field so very large crawls stay bounded in memory
+_MAX_VALUES_PER_FIELD = int(os.getenv('SCRAPY_MAX_VALUES_PER_FIELD', '10000'))
+
+
+def _new_value_set():
+    return SortedSet() if SORTEDCONTAINERS_AVAILABLE else set()
+
+
+def _sorted_values(values) -> List[Any]:
+    return list(values) if SORTEDCONTAINERS_AVAILABLE else sorted(values)
+
+
+def _update_capped(target: set, values) -> None:
+    """Add values to target until it holds _MAX_VALUES_PER_FIELD entries."""
+    if len(target) + len(values) <= _MAX_VALUES_PER_FIELD:
+        target.update(values)
+        return
+    for value in values:
+        if len(target) >= _MAX_VALUES_PER_FIELD:
+            break
+        target.add(value)
+
+
 class ItemsCollectorPipeline:
     """Pipeline to collect scraped items and aggregate data from multiple pages"""
     
     def __init__(self):
         self.items_by_url = {}
+        self._dirty_sites = set()
+        self._flush_call = None
+        self._job = None
     
     @classmethod
     def from_crawler(cls, crawler):
@@ -220,232 +364,265 @@ class ItemsCollectorPipeline:
     def open_spider(self, spider):
         """Called when spider opens"""
         self.items_by_url = {}
+        self._dirty_sites = set()
+        self._job = _ensure_job_structures(getattr(spider, "job_id", None) or "default")
+        # Publish changed aggregates to live results a few times a second instead
+        # of on every item
+        self._flush_call = LoopingCall(self._flush_live)
+        self._flush_call.start(_LIVE_FLUSH_INTERVAL, now=False)
+
+    def _flush_live(self):
+        """Copy aggregates changed since the last flush into live results."""
+        if not self._dirty_sites:
+            return
+        snapshots = {website: _live_snapshot(self.items_by_url[website]) for website in self._dirty_sites}
+        self._dirty_sites.clear()
+        with self._job.lock:
+            self._job.live.update(snapshots)
     
     def process_item(self, item, spider):
-        job_id = getattr(spider, "job_id", None) or "default"
-        _ensure_job_structures(job_id)
-
         website = item.get('website')
-        print(f"Pipeline processing item for {website}: {len(item.get('emails', []))} emails, {len(item.get('phones', []))} phones")
+        logger.debug(
+            "Pipeline processing item for %s: %d emails, %d phones",
+            website, len(item.get('emails', ())), len(item.get('phones', ())),
+        )
         
-        if website not in self.items_by_url:
-            self.items_by_url[website] = {
+        data = self.items_by_url.get(website)
+        if data is None:
+            data = self.items_by_url[website] = {
                 'website': website,
-                'emails': set(),
-                'phones': set(),
-                'vcard_links': set(),
+                'emails': _new_value_set(),
+                'phones': _new_value_set(),
+                'vcard_links': _new_value_set(),
                 'vcard_files': [],  # List of dicts
-                'pdf_links': set(),
-                'image_links': set(),
+                'vcard_file_urls': set(),  # url of each entry in vcard_files
+                'pdf_links': _new_value_set(),
+                'image_links': _new_value_set(),
                 'lawyer_profiles': [],  # List of profile dicts
+                'profile_urls': set(),  # profile_url of each entry in lawyer_profiles
             }
+            # The site's start page is in; let jobs tracked in the database
+            # (Celery) show it as completed while the crawl goes on.
+            queue_url_status = getattr(spider, 'queue_url_status', None)
+            if queue_url_status is not None:
+                queue_url_status(website, 'completed')
         
-        # Aggregate data
-        data = self.items_by_url[website]
-        data['emails'].update(item.get('emails', []))
-        data['phones'].update(item.get('phones', []))
-        data['vcard_links'].update(item.get('vcard_links', []))
-        data['pdf_links'].update(item.get('pdf_links', []))
-        data['image_links'].update(item.get('image_links', []))
+        # Aggregate data. Only the reactor thread touches these aggregates (the
+        # flusher runs there too), so no lock is needed.
+        _update_capped(data['emails'], item.get('emails', ()))
+        _update_capped(data['phones'], item.get('phones', ()))
+        _update_capped(data['vcard_links'], item.get('vcard_links', ()))
+        _update_capped(data['pdf_links'], item.get('pdf_links', ()))
+        _update_capped(data['image_links'], item.get('image_links', ()))
         
-        # Aggregate vCard files (avoid duplicates by URL)
+        # Aggregate vCard files (avoid duplicates by URL). WebsiteSpider always
+        # builds these dicts with 'url' / 'profile_url', so index them directly.
         vcard_files = item.get('vcard_files', [])
-        existing_vcard_urls = {v.get('url') for v in data['vcard_files']}
+        existing_vcard_urls = data['vcard_file_urls']
         for vcard_file in vcard_files:
-            if isinstance(vcard_file, dict) and vcard_file.get('url') not in existing_vcard_urls:
+            if len(existing_vcard_urls) >= _MAX_VALUES_PER_FIELD:
+                break
+            vcard_url = vcard_file['url']
+            if vcard_url not in existing_vcard_urls:
                 data['vcard_files'].append(vcard_file)
-                existing_vcard_urls.add(vcard_file.get('url'))
+                existing_vcard_urls.add(vcard_url)
         
         # Aggregate lawyer profiles (avoid duplicates by profile_url)
         lawyer_profiles = item.get('lawyer_profiles', [])
-        existing_profile_urls = {p.get('profile_url') for p in data['lawyer_profiles']}
+        existing_profile_urls = data['profile_urls']
         for profile in lawyer_profiles:
-            if isinstance(profile, dict) and profile.get('profile_url') not in existing_profile_urls:
+            if len(existing_profile_urls) >= _MAX_VALUES_PER_FIELD:
+                break
+            profile_url = profile['profile_url']
+            if profile_url not in existing_profile_urls:
                 data['lawyer_profiles'].append(profile)
-                existing_profile_urls.add(profile.get('profile_url'))
-        
-        print(f"After aggregation for {website}: {len(data['emails'])} emails, {len(data['phones'])} phones, {len(data['vcard_files'])} vCard files, {len(data['lawyer_profiles'])} profiles")
-
-        # Save live intermediate results for real-time UI display
-        with live_results_lock:
-            if job_id not in live_results_by_job:
-                live_results_by_job[job_id] = {}
-            # Store a snapshot of current aggregated data
-            live_results_by_job[job_id][website] = {
-                'website': data['website'],
-                'emails': list(data['emails']),
-                'phones': list(data['phones']),
-                'vcard_links': list(data['vcard_links']),
-                'vcard_files': list(data['vcard_files']),
-                'pdf_links': list(data['pdf_links']),
-                'image_links': list(data['image_links']),
-                'lawyer_profiles': list(data['lawyer_profiles']),
-            }
+                existing_profile_urls.add(profile_url)
+
+        self._dirty_sites.add(website)
+
+        logger.debug(
+            "After aggregation for %s: %d emails, %d phones, %d vCard files, %d profiles",
+            website, len(data['emails']), len(data['phones']), len(data['vcard_files']), len(data['lawyer_profiles']),
+        )
 
         return item
     
     def close_spider(self, spider):
         """Called when spider closes - save aggregated items"""
         job_id = getattr(spider, "job_id", None) or "default"
-        _ensure_job_structures(job_id)
+        state = _ensure_job_structures(job_id)
+        if self._flush_call is not None and self._flush_call.running:
+            self._flush_call.stop()
 
-        print(f"Pipeline closing spider for job {job_id}. Items collected: {len(self.items_by_url)}")
+        logger.debug("Pipeline closing spider for job %s. Items collected: %d", job_id, len(self.items_by_url))
         
-        # Save items to memory
-        with items_lock:
-            for website, data in self.items_by_url.items():
-                final_item = {
-                    'website': data['website'],
-                    'emails': sorted(list(data['emails'])),
-                    'phones': sorted(list(data['phones'])),
-                    'vcard_links': sorted(list(data['vcard_links'])),
-                    'vcard_files': data['vcard_files'],
-                    'pdf_links': sorted(list(data['pdf_links'])),
-                    'image_links': sorted(list(data['image_links'])),
-                    'lawyer_profiles': data['lawyer_profiles'],
-                }
-                print(f"Final item for {website}: {len(final_item['emails'])} emails, {len(final_item['phones'])} phones, {len(final_item['vcard_files'])} vCards, {len(final_item['lawyer_profiles'])} profiles")
-                scraped_items_by_job[job_id].append(final_item)
-                
-                # Also save to database for persistence
-                try:
-                    from database import save_scraped_item, create_job, update_job
-                    save_scraped_item(job_id, final_item)
-                    print(f"  → Saved to database: {website}")
-                except Exception as e:
-                    print(f"  → DB save failed: {e}")
-        
-        # Clear live results
-        with live_results_lock:
-            live_results_by_job.pop(job_id, None)
-        
-        # Update progress to completed - CRITICAL for frontend to stop polling
-        items_count = len(scraped_items_by_job.get(job_id, []))
-        with progress_lock:
-            prog = scraping_progress_by_job.get(job_id) or _default_progress_dict()
+        final_items = []
+        for website, data in self.items_by_url.items():
+            final_item = {
+                'website': data['website'],
+                'emails': _sorted_values(data['emails']),
+                'phones': _sorted_values(data['phones']),
+                'vcard_links': _sorted_values(data['vcard_links']),
+                'vcard_files': data['vcard_files'],
+                'pdf_links': _sorted_values(data['pdf_links']),
+                'image_links': _sorted_values(data['image_links']),
+                'lawyer_profiles': data['lawyer_profiles'],
+            }
+            logger.debug(
+                "Final item for %s: %d emails, %d phones, %d vCards, %d profiles",
+                website, len(final_item['emails']), len(final_item['phones']),
+                len(final_item['vcard_files']), len(final_item['lawyer_profiles']),
+            )
+            final_items.append(final_item)
+
+        # Save items to memory, drop live results and update progress to
+        # completed in one step - CRITICAL for frontend to stop polling
+        with state.lock:
+            state.items.extend(final_items)
+            state.live = {}
+            items_count = len(state.items)
+            prog = state.progress
             # Mark all URLs as completed
-            for url in prog.get('urls', []):
-                prog.setdefault('url_status', {})[url] = 'completed'
-            prog['completed'] = len(prog.get('urls', []))
+            for url in prog.urls:
+                prog.set_url_status(url, 'completed')
+            prog.completed = len(prog.urls)
             # Set final status
-            if prog.get('status') != 'cancelled':
-                prog['status'] = 'completed'
-                prog['message'] = f"Scraping completed! Found data for {items_count} website(s)."
-            scraping_progress_by_job[job_id] = prog
+            if prog.status != 'cancelled':
+                prog.status = 'completed'
+                prog.message = f"Scraping completed! Found data for {items_count} website(s)."
+
+        # Also save to database for persistence (one transaction for the whole job)
+        try:
+            from database import save_scraped_items_bulk
+            saved = save_scraped_items_bulk(job_id, final_items)
+            logger.debug("Saved %d item(s) to database for job %s", saved, job_id)
+        except Exception as e:
+            logger.warning("DB save failed for job %s: %s", job_id, e)
         
         # Update job in database
         try:
             from database import update_job
             update_job(job_id, status="completed", completed=items_count, message=f"Found data for {items_count} website(s).")
         except Exception as e:
-            print(f"DB job update failed: {e}")
+            logger.warning("DB job update failed for %s: %s", job_id, e)
         
-        print(f">>> JOB {job_id} COMPLETED - Status: completed, Items: {items_count} <<<")
+        logger.info("Job %s completed: %d item(s)", job_id, items_count)
 
 
 def get_scraping_progress(job_id: str | None = None) -> Dict[str, Any]:
     """Get current scraping progress for a job (defaults to latest)."""
-    resolved = _resolve_job_id(job_id)
-    _ensure_job_structures(resolved)
-    with progress_lock:
-        return (scraping_progress_by_job.get(resolved) or _default_progress_dict()).copy()
+    state = _ensure_job_structures(_resolve_job_id(job_id))
+    with state.lock:
+        return state.progress.to_dict()
 
 
 def get_scraped_results(job_id: str | None = None) -> List[Dict[str, Any]]:
     """Get current scraped results for a job (may be partial if still running)."""
-    resolved = _resolve_job_id(job_id)
-    _ensure_job_structures(resolved)
-    with items_lock:
-        return list(scraped_items_by_job.get(resolved, []))
+    state = _ensure_job_structures(_resolve_job_id(job_id))
+    with state.lock:
+        return list(state.items)
+
+
+def get_all_jobs() -> List[Tuple[str, Dict[str, Any], List[Dict[str, Any]]]]:
+    """Return (job_id, progress, final items) for every job known to this process."""
+    with _jobs_lock:
+        jobs = list(_jobs.items())
+    result = []
+    for job_id, state in jobs:
+        with state.lock:
+            result.append((job_id, state.progress.to_dict(), list(state.items)))
+    return result
 
 
 def reset_progress(job_id: str | None = None) -> None:
     """Reset progress tracking. If job_id is None, resets all jobs."""
-    global scraping_progress_by_job, scraped_items_by_job, _latest_job_id
+    global _latest_job_id
     if job_id is None:
-        with progress_lock:
-            scraping_progress_by_job = {}
-        with items_lock:
-            scraped_items_by_job = {}
+        with _jobs_lock:
+            _jobs.clear()
         with _latest_job_id_lock:
             _latest_job_id = None
         return
 
-    resolved = _resolve_job_id(job_id)
-    with progress_lock:
-        scraping_progress_by_job[resolved] = _default_progress_dict()
-    with items_lock:
-        scraped_items_by_job[resolved] = []
+    state = _ensure_job_structures(_resolve_job_id(job_id))
+    with state.lock:
+        state.progress = ProgressState()
+        state.items = []
 
 
 def update_progress(job_id: str | None = None, status=None, current_url=None, completed=None, message=None, url_status=None):
     """Update scraping progress for a job (defaults to latest)."""
     resolved = _resolve_job_id(job_id)
-    _ensure_job_structures(resolved)
-    with progress_lock:
-        prog = scraping_progress_by_job.get(resolved) or _default_progress_dict()
-        prog["job_id"] = resolved
+    state = _ensure_job_structures(resolved)
+    with state.lock:
+        prog = state.progress
+        prog.job_id = resolved
         if status:
-            prog['status'] = status
+            prog.status = status
         if current_url:
-            prog['current_url'] = current_url
+            prog.current_url = current_url
         if completed is not None:
-            prog['completed'] = completed
+            prog.completed = completed
         if message:
-            prog['message'] = message
+            prog.message = message
         if url_status:
             url, url_stat = url_status
-            prog.setdefault('url_status', {})[url] = url_stat
+            prog.set_url_status(url, url_stat)
             # Auto-update completed count
             if url_stat == 'completed':
-                prog['completed'] = sum(1 for s in prog.get('url_status', {}).values() if s == 'completed')
-        scraping_progress_by_job[resolved] = prog
+                prog.completed = prog.completed_urls
 
 
 def is_job_cancelled(job_id: str) -> bool:
-    with _job_control_lock:
-        return bool(_job_cancelled.get(job_id, False))
+    state = _get_job_state(job_id)
+    return state is not None and state.cancelled
 
 
 def get_scraped_items(job_id: str) -> List[Dict[str, Any]]:
     """Get scraped items for a job. Returns live intermediate results while scraping, final results when done."""
-    _ensure_job_structures(job_id)
-    
-    # Check if we have final results
-    with items_lock:
-        final_items = list(scraped_items_by_job.get(job_id, []))
-    
-    if final_items:
-        return final_items
-    
-    # Return live intermediate results while scraping is in progress
-    with live_results_lock:
-        live_data = live_results_by_job.get(job_id, {})
-        return list(live_data.values())
+    state = _ensure_job_structures(job_id)
+    with state.lock:
+        # Final results once the spider has closed
+        if state.items:
+            return list(state.items)
+        # Live intermediate results while scraping is in progress. Published
+        # snapshots are replaced, never mutated, so they can be shared
+        return list(state.live.values())
+
+
+def _live_snapshot(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a pipeline aggregate into a plain item for the live results."""
+    return {
+        'website': data['website'],
+        'emails': list(data['emails']),
+        'phones': list(data['phones']),
+        'vcard_links': list(data['vcard_links']),
+        'vcard_files': list(data['vcard_files']),
+        'pdf_links': list(data['pdf_links']),
+        'image_links': list(data['image_links']),
+        'lawyer_profiles': list(data['lawyer_profiles']),
+    }
 
 
 def get_job_urls(job_id: str) -> List[str]:
-    _ensure_job_structures(job_id)
-    with progress_lock:
-        prog = scraping_progress_by_job.get(job_id) or _default_progress_dict()
-        return list(prog.get("urls") or [])
+    state = _ensure_job_structures(job_id)
+    with state.lock:
+        return list(state.progress.urls)
 
 
-def start_scrape_job(urls: List[str]) -> str:
+def start_scrape_job(urls: List[str], settings_overrides: Dict[str, Any] | None = None) -> str:
     """
     Start a scrape asynchronously and return a job_id immediately.
     Only one crawl runs at a time (serialized by _crawl_serial_lock).
+    settings_overrides are Scrapy settings for this job only, e.g. a higher
+    CONCURRENT_REQUESTS_PER_DOMAIN for sites known to tolerate it.
     """
     global _latest_job_id
     job_id = _new_job_id()
     with _latest_job_id_lock:
         _latest_job_id = job_id
 
-    _ensure_job_structures(job_id)
-    with items_lock:
-        scraped_items_by_job[job_id] = []
-    with _job_control_lock:
-        _job_cancelled[job_id] = False
+    state = _start_job_state(job_id, urls)
 
     if not urls:
         update_progress(job_id=job_id, status="error", message="No URLs provided.")
@@ -455,21 +632,9 @@ def start_scrape_job(urls: List[str]) -> str:
     try:
         from database import create_job
         create_job(job_id, urls)
-        print(f"Job {job_id} created in database with {len(urls)} URLs")
+        logger.debug("Job %s created in database with %d URLs", job_id, len(urls))
     except Exception as e:
-        print(f"DB job creation failed (non-fatal): {e}")
-
-    with progress_lock:
-        scraping_progress_by_job[job_id] = {
-            'job_id': job_id,
-            'status': 'running',
-            'total': len(urls),
-            'completed': 0,
-            'current_url': '',
-            'urls': urls,
-            'url_status': {url: 'pending' for url in urls},
-            'message': f'Starting to scrape {len(urls)} website(s)...',
-        }
+        logger.warning("DB job creation failed (non-fatal): %s", e)
 
     def _background_start() -> None:
         with _crawl_serial_lock:
@@ -483,27 +648,27 @@ def start_scrape_job(urls: List[str]) -> str:
 
             def _start_in_reactor() -> None:
                 try:
-                    crawler = runner.create_crawler(WebsiteSpider)
-                    with _job_control_lock:
-                        _job_crawlers[job_id] = crawler
+                    crawler = _create_job_crawler(runner, settings_overrides)
+                    with state.lock:
+                        state.crawler = crawler
                     deferred = runner.crawl(crawler, urls=urls, job_id=job_id)
                 except Exception as e:  # pragma: no cover
                     update_progress(job_id=job_id, status="error", message=f"Error during crawling: {e}")
                     return
 
                 def _cleanup():
-                    with _job_control_lock:
-                        _job_crawlers.pop(job_id, None)
+                    with state.lock:
+                        state.crawler = None
 
                 def on_complete(_result):
-                    print(f"[on_complete] Job {job_id} finished")
+                    logger.debug("on_complete: job %s finished", job_id)
                     items_count = len(get_scraped_items(job_id))
                     update_progress(
                         job_id=job_id,
                         status="completed",
                         message=f"Scraping completed! Found data for {items_count} website(s).",
                     )
-                    print(f"[on_complete] Status set to completed for {job_id}")
+                    logger.debug("on_complete: status set to completed for %s", job_id)
                     _cleanup()
                     return _result
 
@@ -532,10 +697,10 @@ def start_scrape_job(urls: List[str]) -> str:
 
 def stop_scrape_job(job_id: str) -> bool:
     """Best-effort stop for a running job."""
-    _ensure_job_structures(job_id)
-    with _job_control_lock:
-        _job_cancelled[job_id] = True
-        crawler = _job_crawlers.get(job_id)
+    state = _ensure_job_structures(job_id)
+    with state.lock:
+        state.cancelled = True
+        crawler = state.crawler
 
     update_progress(job_id=job_id, status="cancelled", message="Stopping... (best effort)")
 
@@ -573,24 +738,14 @@ def scrape_websites_with_scrapy(urls: List[str], job_id: str | None = None) -> L
     with _latest_job_id_lock:
         _latest_job_id = resolved_job_id
 
-    _ensure_job_structures(resolved_job_id)
-    with items_lock:
-        scraped_items_by_job[resolved_job_id] = []  # Reset for each call
-    
     if not urls:
+        state = _ensure_job_structures(resolved_job_id)
+        with state.lock:
+            state.items = []  # Reset for each call
         return []
     
-    # Initialize progress tracking
-    with progress_lock:
-        scraping_progress_by_job[resolved_job_id] = {
-            'status': 'running',
-            'total': len(urls),
-            'completed': 0,
-            'current_url': '',
-            'urls': urls,
-            'url_status': {url: 'pending' for url in urls},
-            'message': f'Starting to scrape {len(urls)} website(s)...',
-        }
+    # Reset results and initialize progress tracking
+    state = _start_job_state(resolved_job_id, urls)
     
     with _crawl_serial_lock:
         update_progress(job_id=resolved_job_id, message='Initializing scraper...')
@@ -604,25 +759,48 @@ def scrape_websites_with_scrapy(urls: List[str], job_id: str | None = None) -> L
         def _start_crawl_in_reactor() -> None:
             """Runs inside the reactor thread."""
             try:
-                deferred = runner.crawl(WebsiteSpider, urls=urls, job_id=resolved_job_id)
+                crawler = runner.create_crawler(WebsiteSpider)
+                with state.lock:
+                    state.crawler = crawler
+                deferred = runner.crawl(crawler, urls=urls, job_id=resolved_job_id)
             except Exception as e:  # pragma: no cover
                 error_holder["error"] = e
                 update_progress(job_id=resolved_job_id, status='error', message=f'Error during crawling: {e}')
                 crawling_done.set()
                 return
 
+            def on_timeout():
+                # Stop the crawler itself so its connections are released; the
+                # crawl Deferred then fires normally with whatever was collected.
+                error_holder["timed_out"] = True
+                crawler.stop()
+
+            timeout_call = reactor.callLater(_SYNC_CRAWL_TIMEOUT, on_timeout)
+
+            def _cleanup():
+                if timeout_call.active():
+                    timeout_call.cancel()
+                with state.lock:
+                    state.crawler = None
+
             def on_complete(_result):
-                with items_lock:
-                    items_count = len(scraped_items_by_job.get(resolved_job_id, []))
-                update_progress(
-                    job_id=resolved_job_id,
-                    status='completed',
-                    message=f'Scraping completed! Found data for {items_count} website(s).',
-                )
+                _cleanup()
+                if error_holder.get("timed_out"):
+                    # Set after the pipeline's close_spider, which marks the job completed
+                    update_progress(job_id=resolved_job_id, status='error', message='Scraping timed out (5 minutes).')
+                else:
+                    with state.lock:
+                        items_count = len(state.items)
+                    update_progress(
+                        job_id=resolved_job_id,
+                        status='completed',
+                        message=f'Scraping completed! Found data for {items_count} website(s).',
+                    )
                 crawling_done.set()
                 return _result
 
             def on_error(failure):
+                _cleanup()
                 # Twisted Failure has getErrorMessage()
                 error_msg = (
                     failure.getErrorMessage()
@@ -638,15 +816,16 @@ def scrape_websites_with_scrapy(urls: List[str], job_id: str | None = None) -> L
 
         reactor.callFromThread(_start_crawl_in_reactor)
 
-        # Wait for crawling to complete (with timeout)
-        if not crawling_done.wait(timeout=300):  # 5 minute timeout
-            update_progress(job_id=resolved_job_id, status='error', message='Scraping timed out (5 minutes).')
+        # The reactor enforces the timeout and stops the crawl; this wait only
+        # backstops a crawler that fails to shut down after being stopped.
+        if not crawling_done.wait(timeout=_SYNC_CRAWL_TIMEOUT + 60):
+            logger.warning("Crawl for job %s did not shut down after its timeout", resolved_job_id)
 
         # Return results collected so far
-        with items_lock:
-            result = list(scraped_items_by_job.get(resolved_job_id, []))
-            if not result:
-                print("Warning: No items were scraped. This might indicate an issue with the spider or pipeline.")
-                update_progress(job_id=resolved_job_id, message='No data collected. Check if URLs are accessible.')
+        with state.lock:
+            result = list(state.items)
+        if not result:
+            logger.warning("No items were scraped. This might indicate an issue with the spider or pipeline.")
+            update_progress(job_id=resolved_job_id, message='No data collected. Check if URLs are accessible.')
 
         return result
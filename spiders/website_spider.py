@@ -38,13 +38,43 @@ class WebsiteSpider(Spider):
         'our-people', 'attorneys', 'lawyers', 'partner', 'associate',
         'counsel', 'staff', 'professional', 'member'
     ]
+
+    # The keyword lists above as single compiled alternations: one C-level scan
+    # per string instead of one `in` check per keyword.
+    _GENERIC_EMAIL_RE = re.compile('|'.join(re.escape(p.replace('@', '')) for p in GENERIC_EMAIL_PATTERNS))
+    _PROFILE_KEYWORDS_RE = re.compile('|'.join(map(re.escape, PROFILE_KEYWORDS)))
+    # Page-content hints for _is_lawyer_profile_page (case-insensitive, so the
+    # page text is not lowercased into a copy).
+    _PROFILE_INDICATORS_RE = re.compile(
+        r'attorney profile|lawyer profile|biography|bio|practice areas|bar admission|education|experience',
+        re.IGNORECASE,
+    )
+    _ATTORNEY_OR_LAWYER_RE = re.compile(r'attorney|lawyer', re.IGNORECASE)
+    _PROFILE_NAME_RE = re.compile(
+        r'<h[1-3][^>]*>([A-Z][a-z]+ [A-Z][a-z]+)'  # Name in heading
+        r'|class="[^"]*name[^"]*"[^>]*>([A-Z][a-z]+ [A-Z][a-z]+)'  # Name in class
+    )
+    # Extraction patterns run on every page
+    _EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+    _PHONE_CANDIDATE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+    _NON_DIGIT_RE = re.compile(r"\D")
+    _CSS_URL_RE = re.compile(r'url\(["\']?([^"\')]+)["\']?\)')
     
     # Playwright settings for JavaScript rendering
     use_playwright = os.getenv("USE_PLAYWRIGHT", "false").lower() == "true"
+
+    # Seconds to gather URL status changes before writing them as one UPDATE.
+    URL_STATUS_FLUSH_DELAY = 0.5
     
-    def __init__(self, urls=None, job_id=None, use_js=None, *args, **kwargs):
+    def __init__(self, urls=None, job_id=None, use_js=None, persist_url_status=False, *args, **kwargs):
         super(WebsiteSpider, self).__init__(*args, **kwargs)
         self.job_id = job_id or "default"
+        # Write per-URL status to the jobs table as it changes (Celery workers,
+        # whose in-memory progress the web process cannot see).
+        self.persist_url_status = persist_url_status
+        self._pending_url_status = {}
+        self._url_status_flush = None
+        self._completed_urls = set()  # base URLs whose last recorded status is 'completed'
         if urls:
             self.start_urls = urls if isinstance(urls, list) else [urls]
         else:
@@ -63,6 +93,47 @@ class WebsiteSpider(Spider):
         if self.use_playwright:
             self.logger.info("Playwright enabled for JavaScript rendering")
     
+    def queue_url_status(self, base_url, status):
+        """
+        Record one URL's status in the database when persist_url_status is set.
+        Changes are held for URL_STATUS_FLUSH_DELAY and written together.
+        """
+        if not self.persist_url_status:
+            return
+        self._pending_url_status[base_url] = status
+        if status == 'completed':
+            self._completed_urls.add(base_url)
+        else:
+            self._completed_urls.discard(base_url)
+        if self._url_status_flush is None:
+            from twisted.internet import reactor
+            self._url_status_flush = reactor.callLater(self.URL_STATUS_FLUSH_DELAY, self._flush_url_status)
+
+    def _flush_url_status(self):
+        """Hand pending URL statuses to the database writer without waiting on it."""
+        if self._url_status_flush is not None and self._url_status_flush.active():
+            self._url_status_flush.cancel()
+        self._url_status_flush = None
+        if not self._pending_url_status:
+            return
+        statuses, self._pending_url_status = self._pending_url_status, {}
+        try:
+            from database import set_url_statuses
+            future = set_url_statuses(self.job_id, statuses, completed=len(self._completed_urls))
+        except Exception as e:
+            self.logger.warning(f"Could not save status for {len(statuses)} URL(s): {e}")
+            return
+
+        def log_failure(f):
+            if f.exception() is not None:
+                self.logger.warning(f"Could not save status for {len(statuses)} URL(s): {f.exception()}")
+
+        future.add_done_callback(log_failure)
+
+    def closed(self, reason):
+        """Write any URL statuses still waiting for the flush timer."""
+        self._flush_url_status()
+
     def _get_playwright_meta(self) -> dict:
         """Get Playwright meta options for JavaScript rendering."""
         if not self.use_playwright or not PLAYWRIGHT_AVAILABLE:
@@ -85,6 +156,12 @@ class WebsiteSpider(Spider):
         ).getall()
         return " ".join(t.strip() for t in texts if t and t.strip())
 
+    def _find_emails(self, text: str) -> list:
+        """Email addresses in text; pages without an '@' skip the regex scan."""
+        if '@' not in text:
+            return []
+        return self._EMAIL_RE.findall(text)
+
     def _normalize_phone(self, raw: str, *, from_tel: bool = False) -> str | None:
         """Normalize and validate phone-ish strings into a compact form."""
         if not raw:
@@ -94,7 +171,7 @@ class WebsiteSpider(Spider):
         raw_no_tel = raw[4:] if raw.lower().startswith("tel:") else raw
 
         # Reject bare long digit strings coming from page text; allow for tel: links.
-        raw_digits_only = re.sub(r"\D", "", raw_no_tel)
+        raw_digits_only = self._NON_DIGIT_RE.sub("", raw_no_tel)
         if not raw_digits_only:
             return None
 
@@ -135,9 +212,11 @@ class WebsiteSpider(Spider):
                 'phones': set(),
                 'vcard_links': set(),
                 'vcard_files': [],  # List of dicts with url, content (base64), size
+                'vcard_file_urls': set(),  # URLs already in vcard_files
                 'pdf_links': set(),
                 'image_links': set(),
                 'lawyer_profiles': [],  # List of lawyer profile data
+                'profile_urls': set(),  # profile_url of each entry in lawyer_profiles
                 'pages_seen': 0,
             }
             # Update progress
@@ -146,6 +225,7 @@ class WebsiteSpider(Spider):
                 update_progress(job_id=self.job_id, current_url=base_url, url_status=(base_url, 'scraping'), message=f'Scraping {base_url}...')
             except:
                 pass
+            self.queue_url_status(base_url, 'scraping')
             # Priority 0 = highest; all base URLs get processed first in parallel
             # Include Playwright meta if enabled for JavaScript rendering
             meta = {'base_url': base_url, 'depth': 0}
@@ -163,39 +243,28 @@ class WebsiteSpider(Spider):
             update_progress(job_id=self.job_id, url_status=(base_url, 'error'), message=f'Error scraping {base_url}: {str(failure.value)}')
         except:
             pass
+        self.queue_url_status(base_url, 'error')
     
     def _is_lawyer_profile_page(self, url, response):
         """Check if current page is a lawyer profile page"""
-        url_lower = url.lower()
-        text_lower = response.text.lower()
-        
         # Check URL for profile keywords
-        if any(keyword in url_lower for keyword in self.PROFILE_KEYWORDS):
+        if self._PROFILE_KEYWORDS_RE.search(url.lower()):
             return True
         
         # Check page content for profile indicators
-        profile_indicators = [
-            'attorney profile', 'lawyer profile', 'biography', 'bio',
-            'practice areas', 'bar admission', 'education', 'experience'
-        ]
-        if any(indicator in text_lower for indicator in profile_indicators):
+        text = response.text
+        if self._PROFILE_INDICATORS_RE.search(text):
             # Make sure it's not just a listing page
-            if 'attorney' in text_lower or 'lawyer' in text_lower:
+            if self._ATTORNEY_OR_LAWYER_RE.search(text):
                 # Check for individual name patterns (likely a profile)
-                name_patterns = [
-                    r'<h[1-3][^>]*>([A-Z][a-z]+ [A-Z][a-z]+)',  # Name in heading
-                    r'class="[^"]*name[^"]*"[^>]*>([A-Z][a-z]+ [A-Z][a-z]+)',  # Name in class
-                ]
-                for pattern in name_patterns:
-                    if re.search(pattern, response.text):
-                        return True
+                if self._PROFILE_NAME_RE.search(text):
+                    return True
         
         return False
     
     def _is_generic_email(self, email):
         """Check if email is generic (not lawyer-specific)"""
-        email_lower = email.lower()
-        return any(pattern.replace('@', '') in email_lower for pattern in self.GENERIC_EMAIL_PATTERNS)
+        return self._GENERIC_EMAIL_RE.search(email.lower()) is not None
     
     def _extract_lawyer_profile(self, response, base_url):
         """Extract lawyer-specific data from a profile page"""
@@ -225,9 +294,8 @@ class WebsiteSpider(Spider):
                     break
         
         # Extract emails - filter out generic ones
-        email_pattern = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
         visible_text = self._visible_text(response)
-        emails = email_pattern.findall(visible_text)
+        emails = self._find_emails(visible_text)
         for email in emails:
             if not self._is_generic_email(email):
                 profile_data['lawyer_email'] = email
@@ -242,14 +310,15 @@ class WebsiteSpider(Spider):
                 break
 
         if not profile_data['lawyer_phone']:
-            phone_candidates = re.findall(r"\+?\d[\d\s().-]{7,}\d", visible_text)
+            phone_candidates = self._PHONE_CANDIDATE_RE.findall(visible_text)
             for cand in phone_candidates:
                 normalized = self._normalize_phone(cand)
                 if normalized:
                     profile_data['lawyer_phone'] = normalized
                     break
         
-        # Extract profile images
+        # Extract profile images (dict keeps first-seen order and dedupes in O(1))
+        profile_images = {}
         img_selectors = [
             'img.profile-photo', 'img.attorney-photo', 'img.lawyer-photo',
             '.profile-image img', '.attorney-image img', '[class*="photo"] img'
@@ -258,15 +327,13 @@ class WebsiteSpider(Spider):
             imgs = response.css(f'{selector}::attr(src)').getall()
             for img in imgs:
                 if img:
-                    full_url = urljoin(response.url, img)
-                    profile_data['profile_images'].append(full_url)
+                    profile_images[urljoin(response.url, img)] = None
         
         # Also check data-src for lazy-loaded images
         for img_data in response.css('img::attr(data-src)').getall():
             if img_data:
-                full_url = urljoin(response.url, img_data)
-                if full_url not in profile_data['profile_images']:
-                    profile_data['profile_images'].append(full_url)
+                profile_images[urljoin(response.url, img_data)] = None
+        profile_data['profile_images'] = list(profile_images)
         
         # Check for vCard on profile page
         vcard_links = response.css('a[href*=".vcf"], a[href*="vcard"]::attr(href)').getall()
@@ -320,16 +387,17 @@ class WebsiteSpider(Spider):
             
             if base_url in self.site_data:
                 # Check if we already have this vCard
-                existing_urls = [v['url'] for v in self.site_data[base_url].get('vcard_files', [])]
-                if vcard_url not in existing_urls:
-                    self.site_data[base_url]['vcard_files'].append(vcard_info)
+                site = self.site_data[base_url]
+                if vcard_url not in site['vcard_file_urls']:
+                    site['vcard_file_urls'].add(vcard_url)
+                    site['vcard_files'].append(vcard_info)
                     self.logger.info(f"Downloaded vCard from {vcard_url} ({vcard_size} bytes)")
             
             # If this vCard was found on a profile page, add to profile
             profile_url = response.meta.get('profile_url')
             if profile_url and base_url in self.site_data:
                 for profile in self.site_data[base_url]['lawyer_profiles']:
-                    if profile.get('profile_url') == profile_url:
+                    if profile['profile_url'] == profile_url:
                         profile['vcard_content'] = vcard_base64
                         break
             
@@ -375,9 +443,11 @@ class WebsiteSpider(Spider):
                 'phones': set(),
                 'vcard_links': set(),
                 'vcard_files': [],
+                'vcard_file_urls': set(),
                 'pdf_links': set(),
                 'image_links': set(),
                 'lawyer_profiles': [],
+                'profile_urls': set(),
                 'pages_seen': 0,
             }
         
@@ -418,13 +488,12 @@ class WebsiteSpider(Spider):
         is_profile_page = self._is_lawyer_profile_page(current_url, response)
         
         # Always extract general emails and phones from all pages
-        email_pattern = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
         visible_text = self._visible_text(response)
         
         # Debug: log visible text length
         self.logger.debug(f"Visible text length on {current_url}: {len(visible_text)} chars")
         
-        emails = email_pattern.findall(visible_text)
+        emails = self._find_emails(visible_text)
         self.logger.debug(f"Raw emails found on {current_url}: {emails[:5]}")  # First 5
         
         # Filter out generic emails
@@ -441,7 +510,7 @@ class WebsiteSpider(Spider):
                 data["phones"].add(normalized)
 
         # Extract phones from visible text
-        phone_candidates = re.findall(r"\+?\d[\d\s().-]{7,}\d", visible_text)
+        phone_candidates = self._PHONE_CANDIDATE_RE.findall(visible_text)
         for cand in phone_candidates:
             normalized = self._normalize_phone(cand)
             if normalized:
@@ -452,8 +521,8 @@ class WebsiteSpider(Spider):
             profile_data = self._extract_lawyer_profile(response, base_url)
             if profile_data.get('lawyer_name') or profile_data.get('lawyer_email') or profile_data.get('lawyer_phone'):
                 # Check if we already have this profile
-                existing_profiles = [p.get('profile_url') for p in data['lawyer_profiles']]
-                if current_url not in existing_profiles:
+                if current_url not in data['profile_urls']:
+                    data['profile_urls'].add(current_url)
                     data['lawyer_profiles'].append(profile_data)
                     self.logger.info(f"Found lawyer profile: {profile_data.get('lawyer_name', 'Unknown')} at {current_url}")
                     # Also add profile email/phone to site-level data
@@ -498,7 +567,7 @@ class WebsiteSpider(Spider):
                 data['image_links'].add(full_url)
         
         # Extract images from CSS background images
-        bg_images = re.findall(r'url\(["\']?([^"\')]+)["\']?\)', response.text)
+        bg_images = self._CSS_URL_RE.findall(response.text)
         for bg_img in bg_images:
             if bg_img:
                 full_url = urljoin(response.url, bg_img)
@@ -527,7 +596,7 @@ class WebsiteSpider(Spider):
                         # Only follow links within the same domain
                         if link_domain == base_domain and full_url not in self.processed_urls:
                             # Prioritize profile-related links
-                            profile_priority = any(keyword in link_lower for keyword in self.PROFILE_KEYWORDS)
+                            profile_priority = self._PROFILE_KEYWORDS_RE.search(link_lower) is not None
                             if (depth == 0 or profile_priority or 
                                 any(keyword in link_lower for keyword in ['contact', 'about', 'team', 'pdf', 'vcard', 'download', 'resources', 'media', 'gallery'])):
                                 self.processed_urls.add(full_url)
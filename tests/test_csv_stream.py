@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+class CoalesceChunksTest(unittest.TestCase):
+    def test_header_is_not_held_back(self):
+        chunks = app._coalesce_chunks(iter(["header\n", "a\n", "b\n"]), size=1024)
+        self.assertEqual(next(chunks), "header\n")
+        self.assertEqual(list(chunks), ["a\nb\n"])
+
+    def test_rows_flush_on_size(self):
+        chunks = app._coalesce_chunks(iter(["h", "a" * 10, "b" * 10, "c"]), size=15)
+        self.assertEqual(list(chunks), ["h", "a" * 10 + "b" * 10, "c"])
+
+    def test_rows_flush_on_delay(self):
+        clock = iter([0.0, 0.0, 2.0, 2.0, 2.0])
+        with mock.patch.object(app.time, "monotonic", lambda: next(clock)):
+            chunks = list(app._coalesce_chunks(iter(["h", "a", "b", "c"]), size=1024, max_delay=1.0))
+        self.assertEqual(chunks, ["h", "ab", "c"])
+
+
+class GzipChunksTest(unittest.TestCase):
+    def test_each_chunk_is_decodable_as_it_arrives(self):
+        decompressor = zlib.decompressobj(31)
+        stream = app._gzip_chunks(iter(["header\n", "row\n"]))
+        self.assertEqual(decompressor.decompress(next(stream)), b"header\n")
+        self.assertEqual(decompressor.decompress(next(stream)), b"row\n")
+
+    def test_stream_is_complete_gzip(self):
+        body = b"".join(app._gzip_chunks(iter(["header\n", "row\n"])))
+        self.assertEqual(zlib.decompress(body, 31), b"header\nrow\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import unittest
+
+_DB_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+
+class SetUrlStatusTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        database.init_db()
+
+    def test_keys_match_urls_verbatim(self):
+        urls = ["https://b.com/é", 'https://c.com/a"b', "https://a.com/x"]
+        database.create_job("url-status-job", urls)
+
+        database.set_url_status("url-status-job", urls[0], "completed")
+        database.set_url_status("url-status-job", urls[1], "error")
+
+        status = database.get_job("url-status-job").to_dict()["url_status"]
+        self.assertEqual(
+            status,
+            {urls[0]: "completed", urls[1]: "error", urls[2]: "pending"},
+        )
+
+    def test_batched_statuses_merge_into_existing(self):
+        urls = ["https://a.com", "https://b.com/ü", "https://c.com"]
+        database.create_job("batched-status-job", urls)
+
+        database.set_url_statuses("batched-status-job", {urls[0]: "scraping", urls[1]: "scraping"}).result()
+        database.set_url_statuses("batched-status-job", {urls[1]: "completed"}).result()
+
+        self.assertEqual(
+            database.get_job("batched-status-job").url_status,
+            {urls[0]: "scraping", urls[1]: "completed"},
+        )
+
+    def test_completed_count_is_optional(self):
+        urls = ["https://a.com", "https://b.com"]
+        database.create_job("completed-count-job", urls)
+
+        database.set_url_statuses("completed-count-job", {urls[0]: "completed"}, completed=1).result()
+        database.set_url_statuses("completed-count-job", {urls[1]: "scraping"}).result()
+
+        self.assertEqual(database.get_job("completed-count-job").completed_urls, 1)
+
+    def test_unknown_job_is_ignored(self):
+        database.set_url_status("no-such-job", "https://a.com", "completed")
+        self.assertIsNone(database.get_job("no-such-job"))
+
+
+class ClearExpiredCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        database.init_db()
+
+    def test_removes_only_expired_rows(self):
+        database.save_search_cache("tax", "expired", "us", 1, ["https://a.com"], 1, ttl_hours=-1)
+        database.save_search_cache("tax", "fresh", "us", 1, ["https://b.com"], 1)
+
+        self.assertEqual(database.clear_expired_cache(), 1)
+        self.assertEqual(database.clear_expired_cache(), 0)
+        self.assertIsNotNone(database.get_cached_search("tax", "fresh", "us", 1))
+
+    def test_maybe_vacuum_runs_on_the_writer(self):
+        self.assertIsInstance(database.maybe_vacuum(threshold=0.0), bool)
+        # The writer keeps serving ordinary writes afterwards.
+        database.create_job("after-vacuum-job", ["https://a.com"])
+        self.assertIsNotNone(database.get_job("after-vacuum-job"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from list_importer import normalize_url  # noqa: E402
+
+
+class NormalizeUrlTest(unittest.TestCase):
+    def test_canonical_url_is_returned_unchanged(self):
+        self.assertEqual(normalize_url("https://example.com/a"), "https://example.com/a")
+
+    def test_surrounding_whitespace_is_stripped(self):
+        for raw in (
+            "https://example.com/a\n",
+            "https://example.com/a\r\n",
+            "https://example.com/a \t",
+            " https://example.com/a",
+            "\nhttps://example.com/a\n",
+        ):
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_url(raw), "https://example.com/a")
+
+    def test_trailing_newline_after_punctuation(self):
+        self.assertEqual(normalize_url("example.com.\n"), "https://example.com/")
+
+    def test_blank_input(self):
+        self.assertIsNone(normalize_url(" \n"))
+
+
+if __name__ == "__main__":
+    unittest.main()